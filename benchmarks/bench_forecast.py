@@ -0,0 +1,45 @@
+"""
+Benchmark: what-if scenarios per second.
+
+Compares calling GoalCalculator.simulate_what_if in a loop
+with evaluating the same scenarios in one forecast_batch call.
+
+Run from the project root:
+    python -m benchmarks.bench_forecast --scenarios 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.calculator import GoalCalculator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--horizon", type=int, default=120)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    purchases = rng.uniform(0, 20000, args.scenarios)
+    changes = rng.uniform(-1000, 3000, args.scenarios)
+    calculator = GoalCalculator(target_amount=60000, monthly_contribution=3000, current_savings=5000)
+
+    start = time.perf_counter()
+    for purchase, change in zip(purchases.tolist(), changes.tolist()):
+        calculator.simulate_what_if(purchase_cost=purchase, contribution_change=change)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculator.simulate_scenarios(purchases, changes, 0.05, 0.03, args.horizon)
+    batch_time = time.perf_counter() - start
+
+    print(f"scenarios: {args.scenarios}, horizon: {args.horizon} months")
+    print(f"simulate_what_if loop:      {args.scenarios / loop_time:>14,.0f} scenarios/s")
+    print(f"simulate_scenarios (batch): {args.scenarios / batch_time:>14,.0f} scenarios/s"
+          " (with interest, inflation and monthly trajectories)")
+
+
+if __name__ == "__main__":
+    main()
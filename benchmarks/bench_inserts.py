@@ -0,0 +1,94 @@
+"""
+Benchmark: POST /transactions/ inserts per second.
+
+Runs the same concurrent insert workload twice in fresh interpreters,
+once with the default per-request commit and once with WRITE_COALESCING=1
+(group commit by the transaction writer), each on a temporary database.
+
+Run from the project root:
+    python -m benchmarks.bench_inserts --requests 2000 --concurrency 8
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+async def measure_child(requests: int, concurrency: int, users: int) -> dict:
+    import httpx
+    from sqlalchemy import insert
+
+    import main
+    from db.database import engine
+    from db.models import User
+
+    async with main.lifespan(main.app):
+        with engine.begin() as conn:
+            conn.execute(insert(User), [
+                {"id": i, "username": f"user{i}", "hashed_password": "-"} for i in range(1, users + 1)
+            ])
+        tokens = [main.create_access_token({"sub": f"user{i}"}) for i in range(1, users + 1)]
+        remaining = iter(range(requests))
+
+        async def worker(client):
+            for i in remaining:
+                response = await client.post(
+                    "/transactions/",
+                    json={"name": f"tx {i}", "amount": 10, "type": "expenses",
+                          "color": "#a78bfa", "date": "2025-01-15"},
+                    headers={"Authorization": f"Bearer {tokens[i % users]}"},
+                )
+                if response.status_code != 200:
+                    raise RuntimeError(response.text)
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+                elapsed = time.perf_counter() - started
+    return {"inserts_per_s": round(requests / elapsed, 1), "seconds": round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(measure_child(args.requests, args.concurrency, args.users))
+        print(json.dumps(result))
+        return
+
+    for coalescing in ("0", "1"):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(
+                os.environ,
+                WRITE_COALESCING=coalescing,
+                DATABASE_URL=f"sqlite:///{Path(workdir) / 'inserts.db'}",
+                CURRENCY_CACHE_PATH=str(Path(workdir) / "rates.json"),
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_inserts", "--child",
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--users", str(args.users)],
+                capture_output=True, text=True, check=True, env=env,
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        mode = "group commit" if coalescing == "1" else "per-request commit"
+        print(f"{mode:<20}{result['inserts_per_s']:>10} inserts/s  ({args.requests} requests, "
+              f"concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
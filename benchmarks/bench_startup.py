@@ -0,0 +1,106 @@
+"""
+Benchmark: cold start time of the API.
+
+Every run is a fresh interpreter that measures
+  - import time of main.py,
+  - time to enter the lifespan (startup),
+  - latency of the first /api/currency/rates and /health/live requests,
+with currency providers that hang for --upstream-delay seconds and then
+fail, like an unreachable bank.gov.ua. The database and the rates cache
+live in a temporary directory, so every run starts cold.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --json startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+async def measure_child(upstream_delay: float) -> dict:
+    import httpx
+
+    started = time.perf_counter()
+    import main
+    import_s = time.perf_counter() - started
+
+    async def unreachable(request):
+        await asyncio.sleep(upstream_delay)
+        raise httpx.ConnectError("unreachable", request=request)
+
+    main.currency_service.transport = httpx.MockTransport(unreachable)
+
+    started = time.perf_counter()
+    async with main.lifespan(main.app):
+        lifespan_s = time.perf_counter() - started
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            rates = await client.get("/api/currency/rates")
+            first_request_s = time.perf_counter() - started
+            started = time.perf_counter()
+            await client.get("/health/live")
+            live_s = time.perf_counter() - started
+            ready = await client.get("/health/ready")
+    assert rates.status_code == 200 and rates.json()["rates"], rates.text
+
+    return {
+        "import_s": import_s,
+        "lifespan_s": lifespan_s,
+        "first_request_s": first_request_s,
+        "liveness_s": live_s,
+        "time_to_first_response_s": import_s + lifespan_s + first_request_s,
+        "ready_at_first_request": ready.status_code == 200,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--upstream-delay", type=float, default=5.0)
+    parser.add_argument("--json", type=Path, help="write medians to this JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'startup.db'}"
+            os.environ["CURRENCY_CACHE_PATH"] = str(Path(workdir) / "rates.json")
+            sys.stdout = sys.stderr  # повідомлення застосунку не змішуємо з результатом
+            result = asyncio.run(measure_child(args.upstream_delay))
+            sys.stdout = sys.__stdout__
+        print(json.dumps(result))
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child",
+             "--upstream-delay", str(args.upstream_delay)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    medians = {
+        key: round(statistics.median(run[key] for run in runs), 4)
+        for key in runs[0]
+        if key.endswith("_s")
+    }
+    print(f"runs: {args.runs}, upstream hangs for {args.upstream_delay}s then fails")
+    for key, value in medians.items():
+        print(f"{key:<26}{value * 1000:>10.1f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(medians, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Load test: latency and throughput of the API endpoints.
+
+Seeds a throwaway SQLite database with users and transactions, then
+drives the FastAPI app in-process with concurrent clients. Currency
+providers are replaced by an httpx.MockTransport, so no network is used.
+For every endpoint p50/p95/p99 latency and requests/second are reported.
+
+Run from the project root:
+    python -m benchmarks.load_test --users 1000 --transactions 100000
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --baseline benchmarks/baseline.json --threshold 0.2
+
+With --baseline the exit code is 1 if any endpoint's p95 latency grew,
+or its requests/second dropped, by more than the threshold.
+Latencies depend on the machine: compare against a baseline saved on
+the same machine (benchmarks/baseline.json is a reference recorded with
+the default options after the last change to the endpoints).
+
+Keep --concurrency below the SQLAlchemy pool limit (5 + 10 overflow):
+get_current_user queries the database on the event loop, so more
+concurrent requests than pooled connections stall the app.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+ENDPOINTS = {
+    "balance": "/balance",
+    "transactions": "/transactions/?limit=100",
+    "expenses": "/transactions/expenses?limit=100",
+    "income_range": "/transactions/income?date_from=2024-01-01&date_to=2024-12-31",
+    "search": "/transactions/search?q=coff",
+    "wishlist_plan": "/wishlist/plan",
+    "currency_rates": "/api/currency/rates",
+}
+
+NAMES = ["Coffee", "Netflix", "Salary", "Rent", "Groceries", "Taxi", "Gym", "Freelance"]
+
+
+def mock_currency_upstream(request: httpx.Request) -> httpx.Response:
+    """Answers every currency provider with a fixed NBU-style payload."""
+    return httpx.Response(200, json=[
+        {"cc": "USD", "rate": 41.0, "exchangedate": "01.01.2025"},
+        {"cc": "EUR", "rate": 44.5, "exchangedate": "01.01.2025"},
+        {"cc": "GBP", "rate": 52.1, "exchangedate": "01.01.2025"},
+    ])
+
+
+def seed(users: int, transactions: int, wishlist: int, hashed_password: str):
+    """Bulk-inserts users, transactions and wishlist items."""
+    from sqlalchemy import insert
+    from sqlmodel import Session
+
+    from db.database import engine
+    from db.models import User, Transaction, WishlistItem
+    from db.summary import rebuild_monthly_summary
+
+    rng = random.Random(42)
+    start = date(2020, 1, 1)
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "hashed_password": hashed_password}
+            for i in range(1, users + 1)
+        ])
+        batch = []
+        for i in range(transactions):
+            tx_type = rng.choice(["income", "expenses"])
+            batch.append({
+                "id": f"tx-{i}",
+                "name": rng.choice(NAMES),
+                "amount": round(rng.uniform(10, 5000), 2),
+                "type": tx_type,
+                "color": "#a78bfa",
+                "date": (start + timedelta(days=rng.randrange(365 * 5))).isoformat(),
+                "user_id": rng.randint(1, users),
+            })
+            if len(batch) == 10_000:
+                session.execute(insert(Transaction), batch)
+                batch = []
+        if batch:
+            session.execute(insert(Transaction), batch)
+        session.execute(insert(WishlistItem), [
+            {"name": f"Item {i}", "price": rng.uniform(100, 50_000),
+             "priority": rng.randint(1, 5), "owner_id": rng.randint(1, users)}
+            for i in range(wishlist)
+        ])
+        session.commit()
+        rebuild_monthly_summary(session)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_endpoint(client, path, tokens, requests, concurrency) -> dict:
+    """Sends `requests` GETs to `path` from `concurrency` workers."""
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            token = random.choice(tokens)
+            started = time.perf_counter()
+            response = await client.get(path, headers={"Authorization": f"Bearer {token}"})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: HTTP {response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run(args) -> dict:
+    import main
+
+    main.currency_service.transport = httpx.MockTransport(mock_currency_upstream)
+    tokens = [
+        main.create_access_token({"sub": f"user{i}"})
+        for i in random.Random(7).sample(range(1, args.users + 1), min(args.users, 100))
+    ]
+    endpoints = args.endpoints or list(ENDPOINTS)
+
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in endpoints:
+                path = ENDPOINTS[name]
+                # Ендпоінти друкують налагоджувальні повідомлення — ховаємо їх вивід
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await run_endpoint(client, path, tokens, min(20, args.requests), args.concurrency)
+                    results[name] = await run_endpoint(
+                        client, path, tokens, args.requests, args.concurrency
+                    )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns descriptions of endpoints that regressed beyond the threshold."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {base['rps']} -> {current['rps']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--wishlist", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="*", choices=list(ENDPOINTS))
+    parser.add_argument("--baseline", type=Path, help="JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression, 0.2 = 20%%")
+    parser.add_argument("--save-baseline", type=Path, help="write results to this JSON file")
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir.name) / 'bench.db'}"
+
+    from pwdlib import PasswordHash
+    from db.database import create_db_and_tables
+
+    create_db_and_tables()
+    started = time.perf_counter()
+    seed(args.users, args.transactions, args.wishlist, PasswordHash.recommended().hash("password"))
+    print(f"seeded {args.users} users, {args.transactions} transactions "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    results = asyncio.run(run(args))
+
+    print(f"{'endpoint':<16}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
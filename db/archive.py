@@ -0,0 +1,199 @@
+"""
+Cold storage of old transactions.
+
+The archival job moves each user's transactions older than a horizon
+out of the `transactions` table into a compressed Parquet segment under
+ARCHIVE_DIR with a random (uuid) name, and records the segment with its
+totals in `archive_segments`. Monthly summaries and rollups already
+include archived rows (and their rebuilds read the segments too), so
+statistics are unaffected; /balance adds the manifest totals and
+exports stream the segments.
+
+    python -m db.archive --older-than-days 730
+"""
+import argparse
+import os
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlmodel import Session, select, delete, func
+
+from db.models import ArchiveSegment, Transaction
+
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", "archive"))
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", 730))
+COLUMNS = ("id", "name", "amount", "type", "color", "date")
+
+
+SEGMENT_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("name", pa.string()),
+    ("amount", pa.float64()),
+    ("type", pa.string()),
+    ("color", pa.string()),
+    ("date", pa.string()),  # "YYYY-MM-DD", як у таблиці transactions
+])
+
+
+def write_segment(path: Path, rows: list[Transaction]):
+    """
+    Writes transactions as a compressed Parquet file.
+
+    Raises:
+        FileExistsError: If a file already exists at `path`;
+            segments are never overwritten.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pydict(
+        {column: [getattr(r, column) for r in rows] for column in COLUMNS},
+        schema=SEGMENT_SCHEMA,
+    )
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "xb") as f:
+        pq.write_table(table, f, compression="zstd")
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        # link, на відміну від rename, не замінює наявний файл
+        os.link(tmp, path)
+    finally:
+        tmp.unlink()
+
+
+def read_segment(path: Path, date_from: Optional[str] = None, date_to: Optional[str] = None) -> pa.Table:
+    """Reads a segment, optionally only rows within [date_from, date_to]."""
+    filters = []
+    if date_from:
+        filters.append(("date", ">=", date_from))
+    if date_to:
+        filters.append(("date", "<=", date_to))
+    return pq.read_table(path, filters=filters or None)
+
+
+def archive_user(session: Session, user_id: int, cutoff: str) -> Optional[ArchiveSegment]:
+    """
+    Moves one user's transactions dated before `cutoff` into a new segment.
+
+    The segment file is written first; the manifest row and the deletion
+    of archived rows are committed together, so a crash never loses rows.
+    """
+    rows = session.exec(
+        select(Transaction)
+        .where(Transaction.user_id == user_id, Transaction.date < cutoff)
+        .order_by(Transaction.date)
+    ).all()
+    if not rows:
+        return None
+
+    # Ім'я не залежить від id маніфесту: id відкоченого сегмента SQLite
+    # видає знову, а його файл міг лишитись після збою до коміту
+    path = ARCHIVE_DIR / f"user_{user_id}" / f"segment_{uuid.uuid4().hex}.parquet"
+    segment = ArchiveSegment(
+        user_id=user_id,
+        path=str(path),
+        date_from=rows[0].date,
+        date_to=rows[-1].date,
+        row_count=len(rows),
+        amount_sum=sum(r.amount for r in rows),
+        income=sum(r.amount for r in rows if r.type == "income"),
+        expenses=sum(r.amount for r in rows if r.type == "expenses"),
+    )
+    try:
+        write_segment(path, rows)
+        session.add(segment)
+        session.execute(delete(Transaction).where(Transaction.id.in_([r.id for r in rows])))
+        session.commit()
+    except FileExistsError:
+        session.rollback()
+        raise
+    except Exception:
+        session.rollback()
+        path.unlink(missing_ok=True)
+        raise
+    return segment
+
+
+def archive_old_transactions(session: Session, older_than_days: int = ARCHIVE_HORIZON_DAYS) -> list[ArchiveSegment]:
+    """
+    Archives transactions older than the horizon for every user.
+
+    A user whose segment fails is logged and skipped, so one bad
+    segment does not stop the archival of everyone else.
+    """
+    cutoff = (date.today() - timedelta(days=older_than_days)).isoformat()
+    user_ids = session.exec(
+        select(Transaction.user_id).where(Transaction.date < cutoff).distinct()
+    ).all()
+    segments = []
+    for user_id in user_ids:
+        if user_id is None:
+            continue
+        try:
+            segment = archive_user(session, user_id, cutoff)
+        except Exception as e:
+            print(f"[archive] ✗ User {user_id} skipped: {e}")
+            continue
+        if segment:
+            segments.append(segment)
+    return segments
+
+
+def archived_totals(session: Session, user_id: int) -> tuple[float, int]:
+    """Returns (sum of amounts, number of rows) over the user's archive."""
+    amount, count = session.exec(
+        select(func.sum(ArchiveSegment.amount_sum), func.sum(ArchiveSegment.row_count))
+        .where(ArchiveSegment.user_id == user_id)
+    ).one()
+    return amount or 0.0, count or 0
+
+
+def iter_archived_transactions(session: Session) -> Iterator[list[Transaction]]:
+    """
+    Yields the archived transactions of all users, one segment at a time,
+    as detached Transaction objects (used to rebuild summaries and rollups).
+    """
+    for segment in session.exec(select(ArchiveSegment).order_by(ArchiveSegment.id)).all():
+        rows = read_segment(Path(segment.path)).to_pylist()
+        yield [Transaction(**row, user_id=segment.user_id) for row in rows]
+
+
+def iter_archived_rows(
+    session: Session,
+    user_id: int,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    Yields the user's archived transactions, oldest first.
+
+    Only segments overlapping [date_from, date_to] are read,
+    one segment in memory at a time.
+    """
+    statement = select(ArchiveSegment).where(ArchiveSegment.user_id == user_id)
+    if date_from:
+        statement = statement.where(ArchiveSegment.date_to >= date_from)
+    if date_to:
+        statement = statement.where(ArchiveSegment.date_from <= date_to)
+    segments = session.exec(statement.order_by(ArchiveSegment.date_from)).all()
+
+    for segment in segments:
+        table = read_segment(Path(segment.path), date_from, date_to)
+        for batch in table.to_batches():
+            yield from batch.to_pylist()
+
+
+if __name__ == "__main__":
+    from db.database import engine, create_db_and_tables
+
+    parser = argparse.ArgumentParser(description="Archive old transactions into compressed segments.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_HORIZON_DAYS)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        segments = archive_old_transactions(session, args.older_than_days)
+    print(f"[archive] {len(segments)} segments, {sum(s.row_count for s in segments)} transactions archived")
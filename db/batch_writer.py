@@ -0,0 +1,112 @@
+"""
+Group commit for transaction inserts.
+
+When WRITE_COALESCING=1, POST /transactions/ does not commit on its own.
+Requests put their rows into a queue; a single writer thread takes
+everything queued (waiting up to WRITE_BATCH_DELAY_MS for more, at most
+WRITE_BATCH_SIZE rows) and writes the batch with one multi-row INSERT
+and one commit. Every request waits for the commit of its own batch and
+gets its row back without a refresh query (ids are generated in Python).
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from db.models import Transaction
+from db.summary import apply_transactions
+from db.rollups import apply_rollups
+from db.sync import record_changes
+
+WRITE_COALESCING = os.getenv("WRITE_COALESCING", "0") == "1"
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 200))
+WRITE_BATCH_DELAY_MS = float(os.getenv("WRITE_BATCH_DELAY_MS", 2))
+ACK_TIMEOUT = 30
+
+
+class TransactionWriter:
+    """Writer thread that coalesces concurrent transaction inserts."""
+
+    def __init__(self, engine, max_batch: int = WRITE_BATCH_SIZE, max_delay_ms: float = WRITE_BATCH_DELAY_MS):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "queue.Queue[Optional[tuple[dict, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Запускає потік запису. Викликати з lifespan."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="transaction-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Записує все, що лишилось у черзі, і зупиняє потік."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def write(self, tx: Transaction) -> dict:
+        """
+        Queues a transaction and blocks until its batch is committed.
+
+        Returns:
+            dict: The stored row, including its generated id.
+        """
+        future = Future()
+        self._queue.put((tx.model_dump(), future))
+        return future.result(timeout=ACK_TIMEOUT)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    # До дедлайну чекаємо нові рядки, після нього беремо лише те, що вже в черзі
+                    timeout = deadline - time.monotonic()
+                    item = self._queue.get_nowait() if timeout <= 0 else self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: list[tuple[dict, Future]]):
+        rows = [row for row, _ in batch]
+        try:
+            with Session(self.engine) as session:
+                session.execute(insert(Transaction), rows)
+                transactions = [Transaction(**row) for row in rows]
+                apply_transactions(session, transactions)
+                apply_rollups(session, transactions)
+                record_changes(session, "transaction", [(row["user_id"], row["id"]) for row in rows])
+                session.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                # Один некоректний рядок не повинен зривати весь пакет
+                for one in batch:
+                    self._flush([one])
+            else:
+                batch[0][1].set_exception(e)
+            return
+        for row, future in batch:
+            future.set_result(row)
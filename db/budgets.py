@@ -0,0 +1,119 @@
+"""
+Spending budgets.
+
+A budget caps the user's expenses in one category (transaction name)
+or in total, per ISO week or calendar month. Spent-so-far is not
+counted separately: it is read from the counters that every insert and
+delete already updates in the same commit — one `monthly_summary` row
+or one month rollup row for monthly budgets, at most seven day rollup
+rows for weekly ones.
+
+check_alerts() runs after a new expense is committed and returns the
+budgets whose warning threshold or limit the expense crossed, each at
+most once per period.
+"""
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlmodel import Session, select, func
+
+from db.models import Budget, MonthlySummary, Transaction, TransactionRollup
+from db.rollups import TOTAL
+
+LEVEL_WARNING = 1
+LEVEL_EXCEEDED = 2
+
+
+def period_range(period: str, day: date) -> tuple[date, date]:
+    """First and last day of the budget period containing `day`."""
+    if period == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def spent(session: Session, budget: Budget, day: date) -> float:
+    """Expenses counted against the budget in the period containing `day`."""
+    start, end = period_range(budget.period, day)
+    if budget.period == "month":
+        month = start.isoformat()[:7]
+        if budget.category is None:
+            row = session.get(MonthlySummary, (budget.user_id, month))
+            return row.expenses if row else 0.0
+        row = session.get(TransactionRollup, (budget.user_id, "month", month, "expenses", budget.category))
+        return row.total if row else 0.0
+
+    statement = select(func.sum(TransactionRollup.total)).where(
+        TransactionRollup.user_id == budget.user_id,
+        TransactionRollup.granularity == "day",
+        TransactionRollup.bucket >= start.isoformat(),
+        TransactionRollup.bucket <= end.isoformat(),
+        TransactionRollup.type == "expenses",
+        TransactionRollup.category == (TOTAL if budget.category is None else budget.category),
+    )
+    return session.exec(statement).one() or 0.0
+
+
+def budget_status(session: Session, budget: Budget, today: Optional[date] = None) -> dict:
+    """The budget with its current period, spent and remaining amounts."""
+    today = today or date.today()
+    start, end = period_range(budget.period, today)
+    amount = spent(session, budget, today)
+    return {
+        "id": budget.id,
+        "category": budget.category,
+        "period": budget.period,
+        "limit_amount": budget.limit_amount,
+        "alert_threshold": budget.alert_threshold,
+        "period_start": start.isoformat(),
+        "period_end": end.isoformat(),
+        "spent": round(amount, 2),
+        "remaining": round(budget.limit_amount - amount, 2),
+        "used": round(amount / budget.limit_amount, 4),
+    }
+
+
+def check_alerts(session: Session, tx: Transaction, today: Optional[date] = None) -> list[tuple[Budget, int, float]]:
+    """
+    Finds budgets whose threshold or limit `tx` (already committed) crossed.
+
+    Only the current period is alerted on; the crossed level is stored
+    on the budget and committed, so each level is reported once per period.
+
+    Returns:
+        list[tuple[Budget, int, float]]: Budget, level and spent amount.
+    """
+    if tx.type != "expenses":
+        return []
+    today = today or date.today()
+    tx_day = date.fromisoformat(tx.date)
+    budgets = session.exec(
+        select(Budget).where(
+            Budget.user_id == tx.user_id,
+            (Budget.category == tx.name) | (Budget.category == None),
+        )
+    ).all()
+
+    alerts = []
+    for budget in budgets:
+        start, end = period_range(budget.period, today)
+        if not start <= tx_day <= end:
+            continue
+        amount = spent(session, budget, today)
+        if amount >= budget.limit_amount:
+            level = LEVEL_EXCEEDED
+        elif amount >= budget.limit_amount * budget.alert_threshold:
+            level = LEVEL_WARNING
+        else:
+            continue
+        notified = budget.notified_level if budget.notified_period == start.isoformat() else 0
+        if level > notified:
+            budget.notified_period = start.isoformat()
+            budget.notified_level = level
+            session.add(budget)
+            alerts.append((budget, level, amount))
+    if alerts:
+        session.commit()
+    return alerts
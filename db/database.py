@@ -1,9 +1,16 @@
 """
 Finance Control DataBase
 """
-from sqlmodel import SQLModel, create_engine, Session
+import os
 
-SQLITE_URL = "sqlite:///finance_database.db"
+from sqlmodel import SQLModel, create_engine, Session, select
+
+from db.models import ArchiveSegment, MonthlySummary, Transaction, TransactionRollup
+from db.search import create_search_index
+from db.summary import rebuild_monthly_summary
+from db.rollups import TOTAL, rebuild_rollups
+
+SQLITE_URL = os.getenv("DATABASE_URL", "sqlite:///finance_database.db")
 
 engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
 
@@ -19,6 +26,26 @@ def create_db_and_tables():
         create_db_and_tables()
     """
     SQLModel.metadata.create_all(engine)
+    # create_all не додає нові індекси до вже існуючих таблиць
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    create_search_index(engine)
+    with Session(engine) as session:
+        # Бази, створені до появи підсумкових таблиць, заповнюємо один раз
+        has_summary = session.exec(select(MonthlySummary.user_id).limit(1)).first()
+        has_transactions = (
+            session.exec(select(Transaction.id).limit(1)).first()
+            or session.exec(select(ArchiveSegment.id).limit(1)).first()
+        )
+        if has_transactions and not has_summary:
+            rebuild_monthly_summary(session)
+        # Рядки-підсумки (category = TOTAL) з'явились пізніше за самі rollups
+        has_rollups = session.exec(
+            select(TransactionRollup.user_id).where(TransactionRollup.category == TOTAL).limit(1)
+        ).first()
+        if has_transactions and not has_rollups:
+            rebuild_rollups(session)
 
 def get_session():
     """
@@ -0,0 +1,256 @@
+"""
+Columnar analytics export.
+
+Writes every user's transactions, wishlist items and goals as Parquet
+files for bulk analysis:
+
+    exports/<timestamp>/transactions/month=2024-01/part-0.parquet
+    exports/<timestamp>/wishlist.parquet
+    exports/<timestamp>/goals.parquet
+
+Transactions are partitioned by month (hive style, readable with
+pyarrow.dataset, pandas or DuckDB) and each partition is written by its
+own worker process, which reads only its month through the index on
+`transactions.date`. Workers read in chunks of EXPORT_CHUNK_ROWS and
+append row groups, so memory stays bounded regardless of table size.
+`name`, `type` and `color` are dictionary encoded; legacy dates that are
+not valid YYYY-MM-DD are exported as null. Archived transactions
+(see db/archive.py) are exported into their months as well.
+
+    python -m db.export --workers 4
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text
+
+EXPORT_DIR = Path(os.getenv("EXPORT_DIR", "exports"))
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 50_000))
+
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+TRANSACTION_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("user_id", pa.int64()),
+    ("name", DICTIONARY),
+    ("amount", pa.float64()),
+    ("type", DICTIONARY),
+    ("color", DICTIONARY),
+    ("date", pa.date32()),
+    ("archived", pa.bool_()),
+])
+WISHLIST_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("owner_id", pa.int64()),
+    ("name", pa.string()),
+    ("price", pa.float64()),
+    ("priority", pa.int64()),
+    ("is_bought", pa.bool_()),
+])
+GOAL_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("owner_id", pa.int64()),
+    ("title", pa.string()),
+    ("target_amount", pa.float64()),
+    ("monthly_contribution", pa.float64()),
+    ("current_savings", pa.float64()),
+])
+
+
+def _parse_date(value: str) -> Optional[date]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _dates(values: pa.Array) -> pa.Array:
+    """Casts YYYY-MM-DD strings to date32; invalid legacy dates become null."""
+    try:
+        return values.cast(pa.date32())
+    except pa.ArrowInvalid:
+        # Записи, створені до перевірки формату дати, не повинні зривати експорт
+        return pa.array([_parse_date(v) for v in values.to_pylist()], pa.date32())
+
+
+def _transaction_batch(columns: dict) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays([
+        pa.array(columns["id"], pa.string()),
+        pa.array(columns["user_id"], pa.int64()),
+        pa.array(columns["name"], pa.string()).dictionary_encode(),
+        pa.array(columns["amount"], pa.float64()),
+        pa.array(columns["type"], pa.string()).dictionary_encode(),
+        pa.array(columns["color"], pa.string()).dictionary_encode(),
+        _dates(pa.array(columns["date"], pa.string())),
+        pa.array(np.full(len(columns["id"]), False)),
+    ], schema=TRANSACTION_SCHEMA)
+
+
+def _archived_batch(batch: pa.RecordBatch, user_id: int) -> pa.RecordBatch:
+    rows = batch.num_rows
+    return pa.RecordBatch.from_arrays([
+        batch.column("id"),
+        pa.array(np.full(rows, user_id), pa.int64()),
+        batch.column("name").dictionary_encode(),
+        batch.column("amount"),
+        batch.column("type").dictionary_encode(),
+        batch.column("color").dictionary_encode(),
+        _dates(batch.column("date")),
+        pa.array(np.full(rows, True)),
+    ], schema=TRANSACTION_SCHEMA)
+
+
+def _chunks(connection, sql: str, params: dict) -> Iterator[list]:
+    result = connection.execution_options(stream_results=True).execute(text(sql), params)
+    while rows := result.fetchmany(EXPORT_CHUNK_ROWS):
+        yield rows
+
+
+def _write(path: Path, schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> int:
+    """Writes batches as row groups of one file; returns the row count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    rows = 0
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        for batch in batches:
+            if batch.num_rows:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    tmp.replace(path)
+    return rows
+
+
+def export_month(database_url: str, month: str, out_dir: str) -> tuple[str, int]:
+    """
+    Exports one month of live and archived transactions.
+
+    Runs in a worker process, so it opens its own engine.
+    """
+    from db.archive import read_segment
+
+    engine = create_engine(database_url)
+    month_from, month_to = f"{month}-01", f"{month}-31"
+
+    def batches():
+        with engine.connect() as connection:
+            live = _chunks(
+                connection,
+                "SELECT id, user_id, name, amount, type, color, date FROM transactions "
+                "WHERE date >= :month_from AND date <= :month_to",
+                {"month_from": month_from, "month_to": month_to},
+            )
+            for rows in live:
+                columns = dict(zip(
+                    ("id", "user_id", "name", "amount", "type", "color", "date"), zip(*rows)
+                ))
+                yield _transaction_batch(columns)
+
+            segments = connection.execute(
+                text("SELECT user_id, path FROM archive_segments "
+                     "WHERE date_from <= :month_to AND date_to >= :month_from"),
+                {"month_from": month_from, "month_to": month_to},
+            ).all()
+        for user_id, segment_path in segments:
+            # Сегменти архіву вже в Parquet: читаємо лише рядки місяця
+            segment = read_segment(Path(segment_path), month_from, month_to)
+            for batch in segment.to_batches(EXPORT_CHUNK_ROWS):
+                yield _archived_batch(batch, user_id)
+
+    path = Path(out_dir) / "transactions" / f"month={month}" / "part-0.parquet"
+    try:
+        rows = _write(path, TRANSACTION_SCHEMA, batches())
+    finally:
+        engine.dispose()
+    if not rows:
+        # Місяць усередині сегмента архіву може не мати жодного рядка
+        path.unlink()
+        path.parent.rmdir()
+    return month, rows
+
+
+def export_table(database_url: str, table: str, out_dir: str) -> tuple[str, int]:
+    """Exports the wishlist or goals table into a single file."""
+    schema = {"wishlist": WISHLIST_SCHEMA, "goals": GOAL_SCHEMA}[table]
+    engine = create_engine(database_url)
+
+    def batches():
+        with engine.connect() as connection:
+            for rows in _chunks(connection, f"SELECT {', '.join(schema.names)} FROM {table}", {}):
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(column).cast(field.type) for column, field in zip(zip(*rows), schema)],
+                    schema=schema,
+                )
+
+    try:
+        return table, _write(Path(out_dir) / f"{table}.parquet", schema, batches())
+    finally:
+        engine.dispose()
+
+
+def export_all(engine, workers: Optional[int] = None, out_dir: Optional[Path] = None) -> dict:
+    """
+    Exports all tables into a new timestamped directory.
+
+    Args:
+        engine: Engine of the database to export.
+        workers: Size of the process pool, defaults to the CPU count.
+        out_dir: Target directory, defaults to EXPORT_DIR/<timestamp>.
+
+    Returns:
+        dict: Output directory and row counts per partition and table.
+    """
+    out_dir = out_dir or EXPORT_DIR / datetime.now().strftime("%Y%m%d_%H%M%S")
+    database_url = engine.url.render_as_string(hide_password=False)
+
+    with engine.connect() as connection:
+        months = connection.execute(
+            text("SELECT DISTINCT substr(date, 1, 7) FROM transactions")
+        ).scalars().all()
+        # Сегмент архіву може охоплювати кілька місяців
+        for date_from, date_to in connection.execute(
+            text("SELECT date_from, date_to FROM archive_segments")
+        ):
+            months.extend(_months_between(date_from[:7], date_to[:7]))
+    months = sorted(set(months))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        month_jobs = [pool.submit(export_month, database_url, m, str(out_dir)) for m in months]
+        table_jobs = [pool.submit(export_table, database_url, t, str(out_dir)) for t in ("wishlist", "goals")]
+        transactions = dict(job.result() for job in month_jobs)
+        tables = dict(job.result() for job in table_jobs)
+
+    return {
+        "path": str(out_dir),
+        "transactions": {m: rows for m, rows in transactions.items() if rows},
+        **tables,
+    }
+
+
+def _months_between(first: str, last: str) -> list[str]:
+    year, month = int(first[:4]), int(first[5:7])
+    months = []
+    while (current := f"{year:04d}-{month:02d}") <= last:
+        months.append(current)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+if __name__ == "__main__":
+    from db.database import engine
+
+    parser = argparse.ArgumentParser(description="Export transactions, wishlist and goals to Parquet.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    result = export_all(engine, args.workers, args.out)
+    total = sum(result["transactions"].values())
+    print(f"[export] {total} transactions in {len(result['transactions'])} months, "
+          f"{result['wishlist']} wishlist items, {result['goals']} goals -> {result['path']}")
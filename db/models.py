@@ -25,11 +25,18 @@ from pydantic import BaseModel
 
 import uuid
 from typing import Optional
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
 
 class Transaction(SQLModel, table=True):
     __tablename__ = "transactions"
+    # Покриває фільтри /transactions/expenses та /transactions/income;
+    # ix_transactions_date — діапазони місяців в експорті (db/export.py)
+    __table_args__ = (
+        Index("ix_transactions_user_type_date", "user_id", "type", "date"),
+        Index("ix_transactions_date", "date"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     name: str
@@ -72,3 +79,127 @@ class WishlistItem(SQLModel, table=True):
     owner_id: int = Field(foreign_key="users.id")
     # Зворотній зв'язок
     owner: Optional[User] = Relationship(back_populates="wishlist_items")
+
+
+# --- Таблиця MONTHLY SUMMARY ---
+# Підсумки транзакцій користувача за місяць, оновлюються при кожному записі
+class MonthlySummary(SQLModel, table=True):
+    __tablename__ = "monthly_summary"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    month: str = Field(primary_key=True)  # "YYYY-MM"
+    income: float = Field(default=0.0)
+    expenses: float = Field(default=0.0)
+    count: int = Field(default=0)
+
+
+# --- Таблиця CHANGE LOG ---
+# Остання зміна кожного запису користувача (для /sync).
+# version — AUTOINCREMENT, тому зростає монотонно і ніколи не повторюється;
+# при новій зміні попередній рядок того ж запису видаляється. Ключ містить
+# user_id: id видаленого запису (wishlist) може отримати запис іншого користувача.
+class ChangeLog(SQLModel, table=True):
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_user_version", "user_id", "version"),
+        UniqueConstraint("user_id", "entity", "entity_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    version: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    entity: str  # "transaction" | "wishlist"
+    entity_id: str
+    op: str  # "upsert" | "delete"
+
+
+# --- Таблиця ROLLUPS ---
+# Суми транзакцій за день ("day", bucket "YYYY-MM-DD") і місяць ("month", "YYYY-MM")
+# у розрізі типу та категорії (назви транзакції)
+class TransactionRollup(SQLModel, table=True):
+    __tablename__ = "transaction_rollups"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    granularity: str = Field(primary_key=True)  # "day" | "month"
+    bucket: str = Field(primary_key=True)
+    type: str = Field(primary_key=True)  # "income" | "expenses"
+    category: str = Field(primary_key=True)
+    total: float = Field(default=0.0)
+    count: int = Field(default=0)
+
+
+# --- Таблиця ARCHIVE SEGMENTS ---
+# Маніфест архівних сегментів: старі транзакції користувача, перенесені з
+# таблиці transactions у стиснений колонковий файл, та їхні підсумки
+class ArchiveSegment(SQLModel, table=True):
+    __tablename__ = "archive_segments"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    path: str
+    date_from: str
+    date_to: str
+    row_count: int
+    amount_sum: float
+    income: float
+    expenses: float
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# --- Таблиця TOKEN REVOCATIONS ---
+# Відкликані токени (jti) та "not before" користувача (усі токени, видані раніше,
+# недійсні). Рядки потрібні лише до expires_at — далі токени й так прострочені.
+class TokenRevocation(SQLModel, table=True):
+    __tablename__ = "token_revocations"
+    __table_args__ = ({"sqlite_autoincrement": True},)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    username: str
+    jti: Optional[str] = None  # None — відкликання всіх токенів до not_before
+    not_before: float = Field(default=0.0)
+    expires_at: float = Field(index=True)
+
+
+# --- Таблиця RECURRING RULES ---
+# Правила регулярних транзакцій (зарплата, оренда, підписки).
+# next_due — дата наступного входження; планувальник вибирає правила за індексом
+# (active, next_due), тому обробка не залежить від кількості користувачів.
+class RecurringRule(SQLModel, table=True):
+    __tablename__ = "recurring_rules"
+    # AUTOINCREMENT: id видаленого правила не повторюється, бо від нього
+    # походять id вже створених транзакцій (db/recurring.py:occurrence_id)
+    __table_args__ = (
+        Index("ix_recurring_rules_active_next_due", "active", "next_due"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    name: str
+    amount: float
+    type: str  # "income" | "expenses"
+    color: str
+    interval: str  # "day" | "week" | "month" | "year"
+    every: int = Field(default=1)
+    start_date: str  # "YYYY-MM-DD", перше входження
+    end_date: Optional[str] = None  # включно
+    occurrences: int = Field(default=0)  # скільки входжень уже створено
+    next_due: Optional[str] = None  # None, якщо правило завершене
+    active: bool = Field(default=True)
+
+
+# --- Таблиця BUDGETS ---
+# Ліміт витрат користувача за категорією (назвою транзакції, None — усі витрати)
+# на тиждень або місяць. Витрачене читається з лічильників monthly_summary і
+# transaction_rollups; notified_* запам'ятовують, про який поріг уже повідомлено.
+class Budget(SQLModel, table=True):
+    __tablename__ = "budgets"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    category: Optional[str] = None
+    period: str  # "week" | "month"
+    limit_amount: float
+    alert_threshold: float = Field(default=0.8)  # частка ліміту для попередження
+    notified_period: Optional[str] = None  # початок періоду, "YYYY-MM-DD"
+    notified_level: int = Field(default=0)  # 0 — нічого, 1 — поріг, 2 — ліміт
@@ -0,0 +1,202 @@
+"""
+Recurring transactions.
+
+A rule (`recurring_rules`) describes a transaction repeated every
+`every` days/weeks/months/years from `start_date`. The n-th occurrence
+is always computed from the start date, so monthly rules keep their
+day (31 Jan -> 29 Feb -> 31 Mar) instead of drifting.
+
+materialize_due() creates every occurrence due up to today for all
+users. It reads due rules in batches in (active, next_due, id) index
+order, resuming after the last (next_due, id) seen, and writes each batch with one multi-row INSERT of transactions,
+one executemany UPDATE of the rules and bulk summary, rollup and change
+log updates, in one commit. After downtime the missed occurrences are
+created with their original dates. Transaction ids are derived from
+(rule, occurrence), so a batch processed twice (e.g. by two workers)
+fails on the primary key instead of creating duplicates; such a batch
+is then retried rule by rule, so one conflicting rule does not hold
+back the others.
+
+    python -m db.recurring
+"""
+import asyncio
+import calendar
+import os
+import uuid
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import insert, update, bindparam, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from db.models import RecurringRule, Transaction
+from db.summary import apply_transactions
+from db.rollups import apply_rollups
+from db.sync import record_changes
+
+RECURRING_BATCH_SIZE = int(os.getenv("RECURRING_BATCH_SIZE", 5000))
+RECURRING_INTERVAL_SECONDS = float(os.getenv("RECURRING_INTERVAL_SECONDS", 60))
+# Скільки пропущених входжень одного правила створювати за один пакет
+MAX_CATCH_UP = 1000
+# Наскільки в минуле може починатись нове правило
+MAX_BACKFILL_DAYS = int(os.getenv("RECURRING_MAX_BACKFILL_DAYS", 366))
+INTERVALS = ("day", "week", "month", "year")
+
+_NAMESPACE = uuid.UUID("6f1c3b0e-6a57-4d0e-9a53-2f2f6c1d7a10")
+
+
+def occurrence_date(rule: RecurringRule, n: int) -> date:
+    """Date of the n-th occurrence (n=0 is the start date)."""
+    start = date.fromisoformat(rule.start_date)
+    step = n * rule.every
+    if rule.interval == "day":
+        return start + timedelta(days=step)
+    if rule.interval == "week":
+        return start + timedelta(weeks=step)
+    months = step if rule.interval == "month" else step * 12
+    year, month = divmod(start.month - 1 + months, 12)
+    year, month = start.year + year, month + 1
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def next_due_after(rule: RecurringRule, n: int) -> Optional[str]:
+    """next_due for a rule with n created occurrences, None when it has ended."""
+    due = occurrence_date(rule, n).isoformat()
+    if rule.end_date and due > rule.end_date:
+        return None
+    return due
+
+
+def occurrence_id(rule_id: int, n: int) -> str:
+    return str(uuid.uuid5(_NAMESPACE, f"{rule_id}:{n}"))
+
+
+def materialize_rules(
+    session: Session, rules: list[RecurringRule], today: str, commit: bool = True
+) -> tuple[int, bool]:
+    """
+    Creates the due occurrences of `rules` (up to MAX_CATCH_UP per rule)
+    and commits, unless commit=False.
+
+    Returns:
+        tuple[int, bool]: Transactions created and whether a rule is still due.
+    """
+    transactions = []
+    rule_updates = []
+    still_due = False
+    for rule in rules:
+        n = rule.occurrences
+        due = rule.next_due
+        while due is not None and due <= today and n - rule.occurrences < MAX_CATCH_UP:
+            transactions.append(Transaction(
+                id=occurrence_id(rule.id, n),
+                name=rule.name,
+                amount=rule.amount,
+                type=rule.type,
+                color=rule.color,
+                date=due,
+                user_id=rule.user_id,
+            ))
+            n += 1
+            due = next_due_after(rule, n)
+        rule_updates.append({"rule_id": rule.id, "n": n, "due": due, "seen": rule.occurrences})
+        still_due = still_due or (due is not None and due <= today)
+
+    if transactions:
+        session.execute(insert(Transaction), [tx.model_dump() for tx in transactions])
+    # Core UPDATE через таблицю: executemany з умовою, а не ORM-оновлення за ключем
+    rules_table = RecurringRule.__table__
+    session.connection().execute(
+        update(rules_table)
+        .where(rules_table.c.id == bindparam("rule_id"), rules_table.c.occurrences == bindparam("seen"))
+        .values(occurrences=bindparam("n"), next_due=bindparam("due")),
+        rule_updates,
+    )
+    apply_transactions(session, transactions)
+    apply_rollups(session, transactions)
+    record_changes(session, "transaction", [(tx.user_id, tx.id) for tx in transactions])
+    if commit:
+        session.commit()
+    return len(transactions), still_due
+
+
+def _materialize_each(session: Session, rules: list[RecurringRule], today: str) -> tuple[int, bool]:
+    """
+    Retries a failed batch one rule at a time. Rules are reloaded after
+    the rollback, so rules already processed by another worker create
+    nothing; a rule that still conflicts is skipped and reported.
+    """
+    created, still_due = 0, False
+    for rule in rules:
+        try:
+            rule_created, rule_due = materialize_rules(session, [rule], today)
+        except IntegrityError as e:
+            session.rollback()
+            print(f"[recurring] ✗ Rule {rule.id} skipped: {e.orig}")
+            continue
+        created += rule_created
+        still_due = still_due or rule_due
+    return created, still_due
+
+
+def materialize_due(engine, today: Optional[date] = None) -> int:
+    """
+    Creates all occurrences due up to `today` (inclusive) for every user.
+
+    Returns:
+        int: Number of transactions created.
+    """
+    today = (today or date.today()).isoformat()
+    created = 0
+    with Session(engine) as session:
+        still_due = True
+        while still_due:
+            # Прохід по всіх прострочених правилах пакетами в порядку індексу
+            # (active, next_due, rowid); повторюємо, поки правила з довгою
+            # історією (понад MAX_CATCH_UP) не наздоженуть
+            still_due = False
+            last = ("", 0)
+            while True:
+                rules = session.exec(
+                    select(RecurringRule)
+                    .where(
+                        RecurringRule.active == True,
+                        RecurringRule.next_due <= today,
+                        tuple_(RecurringRule.next_due, RecurringRule.id) > last,
+                    )
+                    .order_by(RecurringRule.next_due, RecurringRule.id)
+                    .limit(RECURRING_BATCH_SIZE)
+                ).all()
+                if not rules:
+                    break
+                last = (rules[-1].next_due, rules[-1].id)
+                try:
+                    batch_created, batch_due = materialize_rules(session, rules, today)
+                except IntegrityError:
+                    # Пакет (або його частину) вже оброблено іншим процесом
+                    session.rollback()
+                    batch_created, batch_due = _materialize_each(session, rules, today)
+                created += batch_created
+                still_due = still_due or batch_due
+                session.expunge_all()
+    return created
+
+
+async def run_scheduler(engine, interval: float = RECURRING_INTERVAL_SECONDS):
+    """Фоновий цикл для lifespan: одразу наздоганяє пропущене, далі — щохвилини."""
+    while True:
+        try:
+            created = await asyncio.to_thread(materialize_due, engine)
+            if created:
+                print(f"[recurring] {created} transactions created")
+        except Exception as e:
+            print(f"[recurring] ✗ Error: {e}")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    from db.database import engine, create_db_and_tables
+
+    create_db_and_tables()
+    print(f"[recurring] {materialize_due(engine)} transactions created")
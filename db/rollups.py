@@ -0,0 +1,214 @@
+"""
+Time-bucketed rollups of transactions.
+
+`transaction_rollups` holds totals per (user, bucket, type, category) for
+days and months, where the category is the transaction name. Rows with
+the empty category (TOTAL) hold the totals of all categories, so a
+series or an overall budget reads one row per bucket and type. Rollups are
+updated in the same database transaction as inserts and deletes, and can
+be rebuilt in bulk:
+
+    python -m db.rollups
+
+Statistics read whole months from the month rollup and only the partial
+months at the edges of the range from the day rollup, so a five-year
+chart is answered from ~60 month rows per type and category.
+"""
+import calendar
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select, delete, and_, or_
+
+from db.models import TransactionRollup, Transaction
+
+GRANULARITIES = {"day": 10, "month": 7}  # довжина префікса дати
+TOTAL = ""  # категорія рядків із підсумком за всі категорії
+
+
+def apply_rollups(session: Session, transactions: list[Transaction], sign: int = 1):
+    """
+    Adds (sign=1) or removes (sign=-1) transactions from the day and
+    month rollups with one upsert per affected row.
+    """
+    deltas = {}
+    for tx in transactions:
+        # Транзакції з порожньою назвою входять лише в підсумок
+        categories = (TOTAL, tx.name) if tx.name != TOTAL else (TOTAL,)
+        for granularity, length in GRANULARITIES.items():
+            for category in categories:
+                key = (tx.user_id, granularity, tx.date[:length], tx.type, category)
+                total, count = deltas.get(key, (0.0, 0))
+                deltas[key] = (total + tx.amount * sign, count + sign)
+
+    for (user_id, granularity, bucket, tx_type, category), (total, count) in deltas.items():
+        statement = insert(TransactionRollup).values(
+            user_id=user_id, granularity=granularity, bucket=bucket,
+            type=tx_type, category=category, total=total, count=count,
+        ).on_conflict_do_update(
+            index_elements=["user_id", "granularity", "bucket", "type", "category"],
+            set_={
+                "total": TransactionRollup.total + total,
+                "count": TransactionRollup.count + count,
+            },
+        )
+        session.execute(statement)
+
+    if sign < 0:
+        # Видаляємо рядки, в яких не лишилось транзакцій
+        session.execute(delete(TransactionRollup).where(
+            TransactionRollup.user_id.in_({key[0] for key in deltas}),
+            TransactionRollup.count <= 0,
+        ))
+
+
+def rebuild_rollups(session: Session):
+    """
+    Recomputes all rollups from the transactions table with
+    INSERT ... SELECT per granularity (per category and totals),
+    then adds the archive segments.
+    """
+    from db.archive import iter_archived_transactions
+
+    session.execute(delete(TransactionRollup))
+    for granularity, length in GRANULARITIES.items():
+        params = {"granularity": granularity, "length": length, "total": TOTAL}
+        session.execute(
+            text(
+                """
+                INSERT INTO transaction_rollups (user_id, granularity, bucket, type, category, total, count)
+                SELECT user_id, :granularity, substr(date, 1, :length), type, name, SUM(amount), COUNT(*)
+                FROM transactions
+                WHERE user_id IS NOT NULL AND name != :total
+                GROUP BY user_id, substr(date, 1, :length), type, name
+                """
+            ),
+            params,
+        )
+        session.execute(
+            text(
+                """
+                INSERT INTO transaction_rollups (user_id, granularity, bucket, type, category, total, count)
+                SELECT user_id, :granularity, substr(date, 1, :length), type, :total, SUM(amount), COUNT(*)
+                FROM transactions
+                WHERE user_id IS NOT NULL
+                GROUP BY user_id, substr(date, 1, :length), type
+                """
+            ),
+            params,
+        )
+    for transactions in iter_archived_transactions(session):
+        apply_rollups(session, transactions)
+    session.commit()
+
+
+def _month_end(day: date) -> date:
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def _month_bucket(index: int) -> str:
+    """Month bucket for a month number (year * 12 + month - 1)."""
+    year, month = divmod(index, 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+
+def read_rollups(session: Session, user_id: int, date_from: date, date_to: date, months: bool = True):
+    """
+    Returns rollup rows covering [date_from, date_to].
+
+    With months=True whole months come from the month rollup and only
+    the days of partial months at the edges from the day rollup.
+    Months are counted as numbers, not dates, so ranges up to
+    date.max do not overflow.
+    """
+    day_ranges = [(date_from, date_to)]
+    month_range = None
+    if months:
+        first_full = date_from.year * 12 + date_from.month - 1 + (date_from.day != 1)
+        last_full = date_to.year * 12 + date_to.month - 1 - (date_to != _month_end(date_to))
+        if first_full <= last_full:
+            month_range = (_month_bucket(first_full), _month_bucket(last_full))
+            day_ranges = []
+            if date_from.day != 1:
+                day_ranges.append((date_from, _month_end(date_from)))
+            if date_to != _month_end(date_to):
+                day_ranges.append((date_to.replace(day=1), date_to))
+
+    conditions = [
+        and_(
+            TransactionRollup.granularity == "day",
+            TransactionRollup.bucket >= start.isoformat(),
+            TransactionRollup.bucket <= end.isoformat(),
+        )
+        for start, end in day_ranges
+    ]
+    if month_range:
+        conditions.append(and_(
+            TransactionRollup.granularity == "month",
+            TransactionRollup.bucket >= month_range[0],
+            TransactionRollup.bucket <= month_range[1],
+        ))
+    if not conditions:
+        return []
+    return list(session.exec(
+        select(TransactionRollup).where(TransactionRollup.user_id == user_id, or_(*conditions))
+    ).all())
+
+
+def bucket_key(bucket: str, granularity: str) -> str:
+    """Maps a day or month bucket to the requested chart granularity."""
+    if granularity == "year":
+        return bucket[:4]
+    if granularity == "month":
+        return bucket[:7]
+    if granularity == "week":
+        day = date.fromisoformat(bucket)
+        return (day - timedelta(days=day.weekday())).isoformat()
+    return bucket
+
+
+def get_statistics(session: Session, user_id: int, date_from: date, date_to: date, granularity: str) -> dict:
+    """
+    Income and expenses per period and per category for a date range.
+
+    Args:
+        granularity: "day", "week" (starting on Monday), "month" or "year".
+
+    Returns:
+        dict: "series" with income, expenses and count per period,
+        "categories" with totals per (type, category) over the range,
+        and "rows_read" — how many rollup rows were used.
+    """
+    rows = read_rollups(session, user_id, date_from, date_to, months=granularity in ("month", "year"))
+
+    series = {}
+    categories = {}
+    for row in rows:
+        if row.category == TOTAL:
+            key = bucket_key(row.bucket, granularity)
+            point = series.setdefault(key, {"bucket": key, "income": 0.0, "expenses": 0.0, "count": 0})
+            point[row.type] = point.get(row.type, 0.0) + row.total
+            point["count"] += row.count
+            continue
+        category = categories.setdefault(
+            (row.type, row.category), {"type": row.type, "category": row.category, "total": 0.0, "count": 0}
+        )
+        category["total"] += row.total
+        category["count"] += row.count
+
+    return {
+        "series": [series[key] for key in sorted(series)],
+        "categories": sorted(categories.values(), key=lambda c: -c["total"]),
+        "rows_read": len(rows),
+    }
+
+
+if __name__ == "__main__":
+    from db.database import engine, create_db_and_tables
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        rebuild_rollups(session)
+        count = len(session.exec(select(TransactionRollup.user_id)).all())
+    print(f"[rollups] rebuilt, {count} rows")
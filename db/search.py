@@ -0,0 +1,149 @@
+"""
+Full-text search over transactions.
+
+On SQLite the names of transactions are indexed by an FTS5 virtual
+table kept in sync with `transactions` by triggers. The owner is
+indexed as well and matched as `user_id:"N"`, so a query only walks
+the postings of one user instead of every user's matching rows.
+Other backends (or SQLite builds without FTS5) fall back to a LIKE query.
+"""
+import re
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from db.models import Transaction
+
+FTS_TABLE = "transactions_fts"
+
+_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5(name, user_id, content='transactions', content_rowid='rowid')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, user_id) VALUES (new.rowid, new.name, new.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, user_id)
+        VALUES ('delete', old.rowid, old.name, old.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF name, user_id ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, user_id)
+        VALUES ('delete', old.rowid, old.name, old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, name, user_id) VALUES (new.rowid, new.name, new.user_id);
+    END
+    """,
+]
+# Індекс старого формату (без user_id) видаляємо разом із тригерами
+_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS transactions_fts_ai",
+    "DROP TRIGGER IF EXISTS transactions_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_fts_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+_fts_enabled = False
+
+
+def create_search_index(engine) -> bool:
+    """
+    Створює FTS5 індекс і тригери синхронізації (лише для SQLite).
+
+    Creates the FTS5 index and its sync triggers on SQLite.
+    The index is rebuilt from `transactions` when it is created
+    for the first time, so existing rows become searchable. An index
+    created before `user_id` was indexed is dropped and rebuilt.
+
+    Returns:
+        bool: True if full-text search is available.
+    """
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE},
+            ).first()
+            if exists:
+                columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({FTS_TABLE})"))}
+                if "user_id" not in columns:
+                    for statement in _FTS_DROP:
+                        conn.execute(text(statement))
+                    exists = None
+            for statement in _FTS_SCHEMA:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    except OperationalError as e:
+        print(f"[search] FTS5 is not available, falling back to LIKE: {e}")
+        return False
+    _fts_enabled = True
+    return True
+
+
+def to_match_query(query: str) -> str:
+    """
+    Converts user input into a safe FTS5 prefix query.
+
+    Every word becomes a quoted prefix term, so "net fli" matches
+    "Netflix family" and FTS5 operators typed by the user are ignored.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_transactions(
+    session: Session,
+    user_id: int,
+    query: str,
+    offset: int = 0,
+    limit: int = 50,
+) -> List[Transaction]:
+    """
+    Searches the user's transactions by name.
+
+    Args:
+        session (Session): Active database session.
+        user_id (int): Owner of the transactions.
+        query (str): Words to search for, matched as prefixes.
+        offset (int): Number of results to skip.
+        limit (int): Page size.
+
+    Returns:
+        List[Transaction]: Matches, best ranked first.
+    """
+    match = to_match_query(query)
+    if not match:
+        return []
+
+    if _fts_enabled:
+        statement = text(
+            f"""
+            SELECT t.* FROM {FTS_TABLE} f
+            JOIN transactions t ON t.rowid = f.rowid
+            WHERE {FTS_TABLE} MATCH :match
+            ORDER BY bm25({FTS_TABLE}, 1.0, 0.0), t.date DESC
+            LIMIT :limit OFFSET :offset
+            """
+        )
+        result = session.execute(
+            select(Transaction).from_statement(statement),
+            {"match": f'user_id:"{user_id}" AND name:({match})', "limit": limit, "offset": offset},
+        )
+        return list(result.scalars().all())
+
+    statement = select(Transaction).where(Transaction.user_id == user_id)
+    for word in re.findall(r"\w+", query):
+        statement = statement.where(Transaction.name.icontains(word))
+    statement = statement.order_by(Transaction.date.desc()).offset(offset).limit(limit)
+    return list(session.exec(statement).all())
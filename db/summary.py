@@ -0,0 +1,102 @@
+"""
+Per-user monthly totals of transactions.
+
+`monthly_summary` holds income, expenses and the number of transactions
+per (user, month). It is updated in the same database transaction as
+every insert or delete, so balance and average savings are read from
+a handful of rows instead of the user's whole history.
+"""
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select, func, case, delete
+
+from db.models import MonthlySummary, Transaction
+
+
+def apply_transaction(session: Session, tx: Transaction, sign: int = 1):
+    """
+    Adds (sign=1) or removes (sign=-1) a transaction from the monthly totals.
+
+    The update is an atomic upsert and is committed together
+    with the caller's session.
+    """
+    income = tx.amount * sign if tx.type == "income" else 0.0
+    expenses = tx.amount * sign if tx.type == "expenses" else 0.0
+    _add_totals(session, tx.user_id, tx.date[:7], income, expenses, sign)
+
+
+def apply_transactions(session: Session, transactions: list[Transaction]):
+    """
+    Adds many new transactions to the monthly totals,
+    with one upsert per (user, month) instead of one per transaction.
+    """
+    totals = {}
+    for tx in transactions:
+        income, expenses, count = totals.get((tx.user_id, tx.date[:7]), (0.0, 0.0, 0))
+        if tx.type == "income":
+            income += tx.amount
+        elif tx.type == "expenses":
+            expenses += tx.amount
+        totals[(tx.user_id, tx.date[:7])] = (income, expenses, count + 1)
+    for (user_id, month), (income, expenses, count) in totals.items():
+        _add_totals(session, user_id, month, income, expenses, count)
+
+
+def _add_totals(session: Session, user_id: int, month: str, income: float, expenses: float, count: int):
+    statement = insert(MonthlySummary).values(
+        user_id=user_id,
+        month=month,
+        income=income,
+        expenses=expenses,
+        count=count,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "month"],
+        set_={
+            "income": MonthlySummary.income + income,
+            "expenses": MonthlySummary.expenses + expenses,
+            "count": MonthlySummary.count + count,
+        },
+    )
+    session.execute(statement)
+
+
+def rebuild_monthly_summary(session: Session):
+    """
+    Recomputes all monthly totals from the transactions table
+    and the archive segments.
+
+    Used to fill the table for databases created before it existed.
+    """
+    from db.archive import iter_archived_transactions
+
+    month = func.substr(Transaction.date, 1, 7)
+    rows = session.exec(
+        select(
+            Transaction.user_id,
+            month,
+            func.sum(case((Transaction.type == "income", Transaction.amount), else_=0.0)),
+            func.sum(case((Transaction.type == "expenses", Transaction.amount), else_=0.0)),
+            func.count(),
+        ).group_by(Transaction.user_id, month)
+    ).all()
+    session.execute(delete(MonthlySummary))
+    session.add_all(
+        MonthlySummary(user_id=user_id, month=m, income=income, expenses=expenses, count=count)
+        for user_id, m, income, expenses, count in rows
+        if user_id is not None
+    )
+    # Заархівовані транзакції вже видалені з transactions, але мають лишитись у підсумках
+    for transactions in iter_archived_transactions(session):
+        apply_transactions(session, transactions)
+    session.commit()
+
+
+def get_monthly_summary(session: Session, user_id: int) -> list[MonthlySummary]:
+    """
+    Returns the user's monthly totals ordered by month.
+    """
+    return list(session.exec(
+        select(MonthlySummary)
+        .where(MonthlySummary.user_id == user_id)
+        .order_by(MonthlySummary.month)
+    ).all())
@@ -0,0 +1,115 @@
+"""
+Change tracking for delta sync.
+
+Every create, update and delete of a transaction or wishlist item is
+recorded in `change_log` in the same database transaction. The log keeps
+only the latest change per record, so its size is bounded by the number
+of records plus tombstones of deleted ones, and /sync?since=<version>
+returns just the records changed after that version.
+"""
+from sqlalchemy import insert
+from sqlmodel import Session, select, delete, func
+
+from db.models import ChangeLog, Transaction, WishlistItem
+
+ENTITIES = {
+    "transaction": Transaction,
+    "wishlist": WishlistItem,
+}
+OWNERS = {
+    "transaction": Transaction.user_id,
+    "wishlist": WishlistItem.owner_id,
+}
+
+
+def record_change(session: Session, user_id: int, entity: str, entity_id, op: str = "upsert"):
+    """
+    Records that a record was created/updated ("upsert") or deleted ("delete").
+
+    The previous log entry of the same record of the same user is
+    replaced, and the new entry gets a version greater than every
+    version issued before.
+    """
+    session.execute(delete(ChangeLog).where(
+        ChangeLog.user_id == user_id,
+        ChangeLog.entity == entity,
+        ChangeLog.entity_id == str(entity_id),
+    ))
+    session.add(ChangeLog(user_id=user_id, entity=entity, entity_id=str(entity_id), op=op))
+
+
+def record_changes(session: Session, entity: str, changes: list[tuple[int, str]], op: str = "upsert"):
+    """
+    Bulk variant of record_change for many (user_id, entity_id) pairs:
+    one delete per user and chunk of ids and one multi-row insert.
+    """
+    ids_by_user = {}
+    for user_id, entity_id in changes:
+        ids_by_user.setdefault(user_id, []).append(str(entity_id))
+    for user_id, ids in ids_by_user.items():
+        for start in range(0, len(ids), 500):
+            session.execute(delete(ChangeLog).where(
+                ChangeLog.user_id == user_id,
+                ChangeLog.entity == entity,
+                ChangeLog.entity_id.in_(ids[start:start + 500]),
+            ))
+    if changes:
+        session.execute(insert(ChangeLog), [
+            {"user_id": user_id, "entity": entity, "entity_id": str(entity_id), "op": op}
+            for user_id, entity_id in changes
+        ])
+
+
+def current_version(session: Session, user_id: int) -> int:
+    """Returns the latest version issued for the user, 0 if none."""
+    return session.exec(
+        select(func.max(ChangeLog.version)).where(ChangeLog.user_id == user_id)
+    ).first() or 0
+
+
+def changes_since(session: Session, user_id: int, since: int) -> dict:
+    """
+    Collects the user's records changed after `since`.
+
+    With since=0 the full current state is returned, which also covers
+    records created before change tracking existed.
+
+    Returns:
+        dict: {"version": int, "<entity>": {"upserted": [...], "deleted": [ids]}}
+    """
+    version = current_version(session, user_id)
+    result = {"version": version}
+
+    if since <= 0:
+        result["transaction"] = {
+            "upserted": session.exec(select(Transaction).where(Transaction.user_id == user_id)).all(),
+            "deleted": [],
+        }
+        result["wishlist"] = {
+            "upserted": session.exec(select(WishlistItem).where(WishlistItem.owner_id == user_id)).all(),
+            "deleted": [],
+        }
+        return result
+
+    changes = session.exec(
+        select(ChangeLog).where(
+            ChangeLog.user_id == user_id,
+            ChangeLog.version > since,
+            ChangeLog.version <= version,
+        )
+    ).all()
+
+    for entity, model in ENTITIES.items():
+        upserted_ids = [c.entity_id for c in changes if c.entity == entity and c.op == "upsert"]
+        if entity == "wishlist":
+            upserted_ids = [int(i) for i in upserted_ids]
+        upserted = []
+        if upserted_ids:
+            upserted = session.exec(
+                select(model).where(model.id.in_(upserted_ids), OWNERS[entity] == user_id)
+            ).all()
+        deleted = [c.entity_id for c in changes if c.entity == entity and c.op == "delete"]
+        if entity == "wishlist":
+            deleted = [int(i) for i in deleted]
+        result[entity] = {"upserted": upserted, "deleted": deleted}
+    return result
@@ -1,18 +1,26 @@
 """
 Finance Control App — FastAPI + React
 """
+import asyncio
+import csv
+import io
+import itertools
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 import random
+import uuid
 from email.message import EmailMessage
 
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Annotated, List, Optional
+from typing import Annotated, List, Literal, Optional
 
 import os
+import math
 import jwt
+import numpy as np
 
 from fastapi import APIRouter
 
@@ -20,18 +28,38 @@ from services.currency_service import currency_service
 
 from fastapi import FastAPI, HTTPException, status, Depends, Query, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import RedirectResponse, JSONResponse, FileResponse
+from fastapi.responses import RedirectResponse, JSONResponse, FileResponse, PlainTextResponse
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from jwt.exceptions import InvalidTokenError
 from pwdlib import PasswordHash
 from sqlmodel import Session, select
 
-from db.database import create_db_and_tables, get_session
+from db.database import create_db_and_tables, get_session, engine
+from db.search import search_transactions
+from db.summary import apply_transaction, get_monthly_summary
+from db.rollups import apply_rollups, get_statistics
+from db.archive import archived_totals, iter_archived_rows
+from db.export import export_all
+from db.recurring import MAX_BACKFILL_DAYS, materialize_rules, run_scheduler
+from db.budgets import budget_status, check_alerts, LEVEL_EXCEEDED
+from db.sync import record_change, changes_since
+from db.batch_writer import TransactionWriter, WRITE_COALESCING
 from db.models import User, Transaction
-from db.models import WishlistItem
-from schemas.schemas import WishlistCreate, WishlistRead
+from db.models import WishlistItem, Goal, RecurringRule, Budget
+from schemas.schemas import WishlistCreate, WishlistRead, WishlistPlan
+from schemas.schemas import GoalCreate, GoalRead, GoalScenarios
+from services.calculator import GoalCalculator, forecast_batch
+from services import simulation
+from services import metrics
+from services import profiling
+from services.revocation import RevocationList
 from schemas.schemas import UserCreate, UserRead, Token, TransactionCreate, TransactionRead
 from schemas.schemas import ForgotPasswordRequest, ResetPasswordRequest
+from schemas.schemas import ProfilingSettings, SyncResponse
+from schemas.schemas import ConversionRequest
+from schemas.schemas import RecurringCreate, RecurringRead
+from schemas.schemas import BudgetCreate, BudgetStatus
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -43,30 +71,86 @@ async def lifespan(app: FastAPI):
     Application lifespan handler.
     Creates the database and all SQLModel tables
     when the application starts.
+    Currency rates are not awaited: the app serves the last saved
+    (or default) rates while the cache is warmed in the background.
     """
     create_db_and_tables()
-    await currency_service.fetch_rates()
+    app.state.db_ready = True
+    if WRITE_COALESCING:
+        transaction_writer.start()
+    revocations.load(engine)
+    currency_service.load_cached()
     currency_service.start()
+    recurring_task = asyncio.create_task(run_scheduler(engine))
     yield
+    recurring_task.cancel()
     currency_service.stop()
-
-SECRET_KEY = (Path(__file__).resolve().parent / "core" / "secret_key").read_text().strip()
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+    transaction_writer.stop()
+    simulation.shutdown()
 
 from dotenv import load_dotenv
 load_dotenv()
 
+SECRET_KEY = os.getenv("SECRET_KEY") or (
+    Path(__file__).resolve().parent / "core" / "secret_key"
+).read_text().strip()
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+revocations = RevocationList(token_lifetime_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 SMTP_SERVER = os.getenv("SMTP_SERVER")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_EMAIL = os.getenv("SMTP_EMAIL")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 
+# Користувачі з доступом до /admin/* (через кому)
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
 password_hash = PasswordHash.recommended()
+# Хешування паролів (argon2) виконується в окремому пулі потоків,
+# щоб не блокувати event loop і не займати потоки обробки запитів
+password_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)),
+    thread_name_prefix="password-hash",
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+transaction_writer = TransactionWriter(engine)
+# Листи-сповіщення надсилаються у фоні, по одному
+notification_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
 SessionDep = Annotated[Session, Depends(get_session)]
 
 app = FastAPI(title="Finance Tracker API", lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+metrics.Gauge(
+    "password_hash_queue_depth",
+    "Password hash jobs waiting for a worker.",
+    lambda: password_executor._work_queue.qsize(),
+)
+profiling.install_slow_query_log(engine)
+
+def username_from_scope(scope: dict) -> Optional[str]:
+    """
+    Повертає username з JWT запиту (header або cookie) без звернення до бази.
+    Використовується профайлером для вибору запитів конкретного користувача.
+
+    Returns the username from the request JWT without a database lookup.
+    """
+    headers = dict(scope.get("headers") or [])
+    token = headers.get(b"authorization", b"").decode()
+    if not token:
+        for part in headers.get(b"cookie", b"").decode().split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "access_token":
+                token = value
+    if token.startswith("Bearer "):
+        token = token.split(" ")[1]
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except InvalidTokenError:
+        return None
+
+app.add_middleware(profiling.ProfilingMiddleware, identify=username_from_scope)
 
 # Папка dist — збірка React/Vite
 # Serve static assets (JS, CSS, images) directly
@@ -95,10 +179,13 @@ def create_access_token(data: dict):
     Створює JWT токен доступу з обмеженим терміном дії.
 
     Creates a JWT access token with an expiration time.
+    The token gets a unique jti and a precise issue time,
+    so it can be revoked on its own or with all older tokens.
     """
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now.timestamp(), "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 async def get_current_user(
@@ -135,12 +222,25 @@ async def get_current_user(
         print("Invalid token error:", e)
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    if revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+
     user = session.exec(select(User).where(User.username == username)).first()
     if not user:
-        raise credentials_exception
+        raise HTTPException(status_code=401, detail="Invalid token")
 
     return user
 
+def get_admin_user(user: Annotated[User, Depends(get_current_user)]) -> User:
+    """
+    Дозволяє доступ лише адміністраторам із ADMIN_USERNAMES.
+
+    Allows access only to users listed in ADMIN_USERNAMES.
+    """
+    if user.username not in ADMIN_USERNAMES:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
 from fastapi.responses import RedirectResponse
 
 # redirect to app   
@@ -183,7 +283,7 @@ def register_and_login(
     db_user = User(
         username=user_in.username,
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password)
+        hashed_password=password_executor.submit(get_password_hash, user_in.password).result()
     )
     session.add(db_user)
     session.commit()
@@ -206,7 +306,9 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], sess
     """
     user = session.exec(select(User).where(User.username == form_data.username)).first()
     print(user)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await asyncio.wrap_future(
+        password_executor.submit(verify_password, form_data.password, user.hashed_password)
+    ):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     token = create_access_token(data={"sub": user.username})
@@ -239,6 +341,10 @@ def create_transaction(
     """
     Creates a new financial transaction for the authenticated user.
 
+    With WRITE_COALESCING=1 the insert is committed together with
+    other concurrent inserts by the transaction writer.
+    Expenses that cross a budget threshold queue an email to the user.
+
     Args:
         data (TransactionCreate): Transaction data provided in the request body.
         session (Session): Active database session.
@@ -251,53 +357,240 @@ def create_transaction(
         **data.model_dump(),
         user_id=user.id,
     )
+    if transaction_writer.running:
+        row = transaction_writer.write(transaction)
+        notify_budget_alerts(session, user, transaction)
+        return row
     print(transaction)
     session.add(transaction)
+    apply_transaction(session, transaction)
+    apply_rollups(session, [transaction])
+    record_change(session, user.id, "transaction", transaction.id)
     session.commit()
     session.refresh(transaction)
+    notify_budget_alerts(session, user, transaction)
     return transaction
 
+def notify_budget_alerts(session: Session, user: User, transaction: Transaction):
+    """
+    Ставить у чергу листи про перевищення бюджетів.
+
+    Checks the budgets affected by a committed transaction and queues
+    alert emails; they are sent by a background thread, so the request
+    does not wait for SMTP. The transaction is already stored, so
+    a failure here is logged and never turns the write into an error.
+    """
+    try:
+        alerts = check_alerts(session, transaction)
+    except Exception as e:
+        session.rollback()
+        print(f"[budgets] Alert check failed for transaction {transaction.id}: {e}")
+        return
+    if not alerts or not user.email:
+        return
+    for budget, level, spent in alerts:
+        category = budget.category or "all expenses"
+        if level == LEVEL_EXCEEDED:
+            subject = f"Budget exceeded: {category}"
+        else:
+            subject = f"Budget {budget.alert_threshold:.0%} used: {category}"
+        body = (
+            f"You have spent {spent:.2f} of your {budget.period}ly budget "
+            f"of {budget.limit_amount:.2f} for {category}."
+        )
+        notification_executor.submit(send_email, user.email, subject, body)
+
+def select_transactions_by_type(
+    user_id: int,
+    tx_type: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    name: Optional[str] = None,
+):
+    """
+    Builds a query for one type of the user's transactions.
+
+    All filters are applied in SQL, so the query is served by the
+    (user_id, type, date) index and only the requested page is loaded.
+
+    Args:
+        user_id (int): Owner of the transactions.
+        tx_type (str): "income" or "expenses".
+        date_from (str | None): Inclusive lower bound, YYYY-MM-DD.
+        date_to (str | None): Inclusive upper bound, YYYY-MM-DD.
+        name (str | None): Case-insensitive substring of the name.
+
+    Returns:
+        Select: Query ordered from the newest transaction.
+    """
+    statement = select(Transaction).where(
+        Transaction.user_id == user_id,
+        Transaction.type == tx_type
+    )
+    if date_from:
+        statement = statement.where(Transaction.date >= date_from)
+    if date_to:
+        statement = statement.where(Transaction.date <= date_to)
+    if name:
+        statement = statement.where(Transaction.name.icontains(name))
+    return statement.order_by(Transaction.date.desc(), Transaction.id)
+
 @app.get("/transactions/expenses", response_model=List[TransactionRead])
 def get_expenses(
     session: SessionDep,
     user: Annotated[User, Depends(get_current_user)],
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=200),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    name: Optional[str] = None,
 ):
     """
-    Returns all expense transactions for the authenticated user.
+    Returns a page of expense transactions for the authenticated user.
 
     Args:
         session (Session): Active database session.
         user (User): Currently authenticated user.
+        offset (int): Number of transactions to skip.
+        limit (int): Page size, at most 200.
+        date_from (str | None): Inclusive start date, YYYY-MM-DD.
+        date_to (str | None): Inclusive end date, YYYY-MM-DD.
+        name (str | None): Substring to search in the transaction name.
 
     Returns:
         List[TransactionRead]: List of user's expense transactions.
     """
-    statement = select(Transaction).where(
-        Transaction.user_id == user.id,
-        Transaction.type == "expenses"
-    )
-    return session.exec(statement).all()
+    statement = select_transactions_by_type(user.id, "expenses", date_from, date_to, name)
+    return session.exec(statement.offset(offset).limit(limit)).all()
 
 @app.get("/transactions/income", response_model=List[TransactionRead])
 def get_income(
     session: SessionDep,
     user: Annotated[User, Depends(get_current_user)],
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=200),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    name: Optional[str] = None,
 ):
     """
-    Returns all income transactions for the authenticated user.
+    Returns a page of income transactions for the authenticated user.
 
     Args:
         session (Session): Active database session.
         user (User): Currently authenticated user.
+        offset (int): Number of transactions to skip.
+        limit (int): Page size, at most 200.
+        date_from (str | None): Inclusive start date, YYYY-MM-DD.
+        date_to (str | None): Inclusive end date, YYYY-MM-DD.
+        name (str | None): Substring to search in the transaction name.
 
     Returns:
         List[TransactionRead]: List of user's income transactions.
     """
-    statement = select(Transaction).where(
-        Transaction.user_id == user.id,
-        Transaction.type == "income"
+    statement = select_transactions_by_type(user.id, "income", date_from, date_to, name)
+    return session.exec(statement.offset(offset).limit(limit)).all()
+
+@app.get("/transactions/archive", response_model=List[TransactionRead])
+def get_archived_transactions(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=200),
+):
+    """
+    Returns a page of the user's archived (cold storage) transactions.
+
+    Only archive segments overlapping the date range are read.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+        date_from (str | None): Inclusive start date, YYYY-MM-DD.
+        date_to (str | None): Inclusive end date, YYYY-MM-DD.
+        offset (int): Number of transactions to skip.
+        limit (int): Page size, at most 200.
+
+    Returns:
+        List[TransactionRead]: Archived transactions, oldest first.
+    """
+    rows = iter_archived_rows(session, user.id, date_from, date_to)
+    return list(itertools.islice(rows, offset, offset + limit))
+
+@app.get("/transactions/export")
+def export_transactions(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+):
+    """
+    Streams all of the user's transactions as CSV.
+
+    Archived transactions are read segment by segment, live ones
+    in chunks, so the export never holds the whole history in memory.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        StreamingResponse: CSV file with id, name, amount, type, color, date.
+    """
+    columns = ["id", "name", "amount", "type", "color", "date"]
+
+    def rows():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        for row in iter_archived_rows(session, user.id):
+            writer.writerow(row)
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        live = session.exec(
+            select(Transaction).where(Transaction.user_id == user.id).order_by(Transaction.date)
+        )
+        for tx in live.yield_per(1000):
+            writer.writerow(tx.model_dump(include=set(columns)))
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=transactions.csv"},
     )
-    return session.exec(statement).all()
+
+@app.get("/transactions/search", response_model=List[TransactionRead])
+def search_user_transactions(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+    q: str = Query(min_length=1, max_length=100),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """
+    Full-text search over the names of the user's transactions.
+
+    Every word of the query is matched as a prefix, so "netf"
+    finds "Netflix". Results are ranked by relevance.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+        q (str): Search query.
+        offset (int): Number of results to skip.
+        limit (int): Page size, at most 200.
+
+    Returns:
+        List[TransactionRead]: Matching transactions, best first.
+    """
+    return search_transactions(session, user.id, q, offset, limit)
 
 @app.delete("/transactions/{tx_id}")
 def delete_transaction(
@@ -325,10 +618,42 @@ def delete_transaction(
     tx = session.get(Transaction, tx_id)
     if not tx or tx.user_id != user.id:
         raise HTTPException(status_code=404, detail="Transaction not found")
+    apply_transaction(session, tx, sign=-1)
+    apply_rollups(session, [tx], sign=-1)
+    record_change(session, user.id, "transaction", tx.id, op="delete")
     session.delete(tx)
     session.commit()
     return {"ok": True}
 
+@app.get("/sync", response_model=SyncResponse)
+def sync(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+    since: int = Query(default=0, ge=0),
+):
+    """
+    Returns transactions and wishlist items changed after a version.
+
+    The client stores the returned `version` and passes it as `since`
+    on the next call, receiving only records created, updated or
+    deleted in between. since=0 returns the full current state.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+        since (int): Version from the previous sync.
+
+    Returns:
+        SyncResponse: New version and, per entity, changed records
+        and IDs of deleted ones.
+    """
+    changes = changes_since(session, user.id, since)
+    return {
+        "version": changes["version"],
+        "transactions": changes["transaction"],
+        "wishlist": changes["wishlist"],
+    }
+
 @app.get("/balance")
 def get_balance(session: SessionDep, user: Annotated[User, Depends(get_current_user)]):
     """
@@ -337,20 +662,79 @@ def get_balance(session: SessionDep, user: Annotated[User, Depends(get_current_u
 
     Calculates the user's current balance
     as the sum of all their transactions.
+    Archived transactions are included via the archive manifest totals.
     """
     transactions = session.exec(select(Transaction).where(Transaction.user_id == user.id)).all()
-    total = sum(t.amount for t in transactions)
-    return {"balance": total, "count": len(transactions)}
+    archived_total, archived_count = archived_totals(session, user.id)
+    total = sum(t.amount for t in transactions) + archived_total
+    return {"balance": total, "count": len(transactions) + archived_count}
+
+@app.get("/statistics")
+def get_user_statistics(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    granularity: Literal["day", "week", "month", "year"] = "month",
+):
+    """
+    Income and expenses over time and per category.
+
+    Answered from precomputed daily and monthly rollups instead of
+    raw transactions: whole months are read from the monthly rollup.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+        date_from (date | None): Start of the range, default one year before date_to.
+        date_to (date | None): End of the range, default today.
+        granularity (str): "day", "week", "month" or "year".
+
+    Returns:
+        dict: Time series, totals per category and the number
+        of rollup rows read.
+
+    Raises:
+        HTTPException: If date_from is after date_to.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    # Не раніше за date.min: віднімання від 0001-xx-xx переповнюється
+    date_from = date_from or max(date_to, date.min + timedelta(days=365)) - timedelta(days=365)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "granularity": granularity,
+        **get_statistics(session, user.id, date_from, date_to, granularity),
+    }
 
 @app.get("/logout")
-def logout():
+def logout(
+    session: SessionDep,
+    request: Request,
+    token: Annotated[Optional[str], Depends(oauth2_scheme)],
+    everywhere: bool = False,
+):
     """
     Виконує вихід користувача,
-    видаляючи JWT токен із cookie.
+    видаляючи JWT токен із cookie
+    та відкликаючи його на сервері.
 
     Logs the user out
-    by removing the JWT token from cookies.
+    by removing the JWT token from cookies
+    and revoking it on the server. With everywhere=true
+    all tokens of the user issued so far are revoked.
     """
+    token = token or request.cookies.get("access_token")
+    if token and token.startswith("Bearer "):
+        token = token.split(" ")[1]
+    try:
+        payload = jwt.decode(token or "", SECRET_KEY, algorithms=[ALGORITHM])
+    except InvalidTokenError:
+        payload = None
+    if payload and payload.get("sub"):
+        revocations.revoke(session, payload["sub"], payload.get("jti"), everywhere=everywhere)
     response = RedirectResponse(url="/")
     response.delete_cookie("access_token")
     return response
@@ -375,6 +759,126 @@ async def get_currency_rates():
         if currency_service.last_update else None
     }
 
+@app.get("/api/currency/intraday")
+async def get_currency_intraday(
+    code: Optional[str] = None,
+    points: int = Query(default=120, ge=0, le=2880),
+):
+    """
+    Returns intraday rate statistics collected from the 30-second updates.
+
+    Moving averages (keyed by window size in samples), min/max,
+    volatility of log returns and the recent series are kept
+    incrementally by the currency service, so no upstream call
+    or recomputation happens per request.
+
+    Args:
+        code (str | None): Currency code; all currencies if omitted.
+        points (int): Number of latest [timestamp, rate] samples to include.
+
+    Returns:
+        dict: Statistics and series per currency code.
+
+    Raises:
+        HTTPException: If there is no intraday data for the currency.
+    """
+    rings = currency_service.intraday.rings
+    codes = [code.upper()] if code else list(rings)
+    if code and codes[0] not in rings:
+        raise HTTPException(status_code=404, detail="No intraday data for this currency")
+    return {
+        c: {**rings[c].stats(), "series": rings[c].series(points)}
+        for c in codes
+    }
+
+async def _convert(day: Optional[str], items: list[tuple[str, str, float]]) -> dict:
+    try:
+        on = date.fromisoformat(day) if day else date.today()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="date must be YYYY-MM-DD")
+    cross_rates = await currency_service.cross_rates_on(on)
+    if cross_rates is None:
+        raise HTTPException(status_code=404, detail=f"No rates for {on.isoformat()}")
+    try:
+        conversions = cross_rates.convert(items)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown currency {e.args[0]}")
+    return {"date": on.isoformat(), "conversions": conversions}
+
+@app.get("/api/currency/convert")
+async def convert_currency(
+    from_currency: str = Query(..., alias="from"),
+    to_currency: str = Query(..., alias="to"),
+    amount: float = 1.0,
+    day: Optional[str] = Query(default=None, alias="date"),
+):
+    """
+    Converts an amount between any two supported currencies (UAH included).
+
+    Uses the cross-rate matrix precomputed on every rates update;
+    for past dates the matrix is built from the stored NBU history.
+    `result` uses the mid rate, `bank_result` the buy/sell prices.
+
+    Args:
+        from_currency (str): Source currency code.
+        to_currency (str): Target currency code.
+        amount (float): Amount in the source currency.
+        day (str | None): Date of the rates, YYYY-MM-DD; today if omitted.
+
+    Returns:
+        dict: The date of the rates and a single conversion.
+
+    Raises:
+        HTTPException: If a currency is unknown or there are no rates for the date.
+    """
+    return await _convert(day, [(from_currency, to_currency, amount)])
+
+@app.post("/api/currency/convert")
+async def convert_currency_batch(data: ConversionRequest):
+    """
+    Converts many amounts and currency pairs in one call.
+
+    Args:
+        data (ConversionRequest): Date of the rates and the conversions.
+
+    Returns:
+        dict: The date of the rates and the conversions in request order.
+
+    Raises:
+        HTTPException: If a currency is unknown or there are no rates for the date.
+    """
+    items = [(i.from_currency, i.to_currency, i.amount) for i in data.items]
+    return await _convert(data.date, items)
+
+@app.get("/health/live", include_in_schema=False)
+def liveness():
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return {"status": "alive"}
+
+@app.get("/health/ready", include_in_schema=False)
+def readiness():
+    """
+    Readiness probe.
+
+    Returns 503 until the database is initialized and the first
+    background update of currency rates has finished (successfully
+    or by falling back to saved rates).
+
+    Returns:
+        JSONResponse: Status and the source of the current rates.
+    """
+    ready = getattr(app.state, "db_ready", False) and currency_service.warmed_up
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up",
+            "database": getattr(app.state, "db_ready", False),
+            "currency_source": currency_service.source,
+        },
+    )
+
 @app.get("/api/currency/update")
 async def update_currency_rates():
     """
@@ -386,13 +890,15 @@ async def update_currency_rates():
     Returns:
         dict: A dictionary containing:
             - rates (dict): Updated currency exchange rates.
-            - last_update (str): Time of the update
-            formatted as HH:MM:SS.
+            - last_update (str | None): Time of the last successful
+            update formatted as HH:MM:SS, or None if the providers
+            have not answered yet.
     """
     rates = await currency_service.fetch_rates(force_update=True)
     return {
         "rates": rates,
         "last_update": currency_service.last_update.strftime("%H:%M:%S")
+        if currency_service.last_update else None
     }
 
 wishlist_router = APIRouter()
@@ -442,10 +948,72 @@ def create_wishlist_item(
     """
     item = WishlistItem(**data.model_dump(), owner_id=user.id)
     session.add(item)
+    session.flush()
+    record_change(session, user.id, "wishlist", item.id)
     session.commit()
     session.refresh(item)
     return item
 
+@wishlist_router.get("/wishlist/plan", response_model=WishlistPlan)
+def get_wishlist_plan(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Plans when each unbought wishlist item becomes affordable.
+
+    Items are bought one after another in order of `priority`.
+    The balance (income minus expenses) and the average monthly
+    savings over the last 3 months are read from the precomputed
+    monthly totals, not from the transaction list.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        WishlistPlan: Balance, average monthly savings and, for every
+        item, the cumulative cost and months until it is affordable
+        (None if savings are not positive).
+    """
+    summary = get_monthly_summary(session, user.id)
+    balance = sum(m.income - m.expenses for m in summary)
+
+    today = datetime.now(timezone.utc).date()
+    year, month = today.year, today.month
+    recent = set()
+    for _ in range(3):
+        recent.add(f"{year:04d}-{month:02d}")
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    monthly_savings = sum(m.income - m.expenses for m in summary if m.month in recent) / 3
+
+    items = session.exec(
+        select(WishlistItem)
+        .where(WishlistItem.owner_id == user.id, WishlistItem.is_bought == False)
+        .order_by(WishlistItem.priority, WishlistItem.id)
+    ).all()
+
+    plan = []
+    cumulative = 0.0
+    for item in items:
+        cumulative += item.price
+        if cumulative <= balance:
+            months_left = 0
+        elif monthly_savings > 0:
+            months_left = math.ceil((cumulative - balance) / monthly_savings)
+        else:
+            months_left = None
+        plan.append({
+            "id": item.id,
+            "name": item.name,
+            "price": item.price,
+            "priority": item.priority,
+            "cumulative_cost": cumulative,
+            "months_until_affordable": months_left,
+        })
+
+    return {"balance": balance, "monthly_savings": round(monthly_savings, 2), "items": plan}
+
 # Змінити статус покупки (is_bought)
 @wishlist_router.patch("/wishlist/{item_id}", response_model=WishlistRead)
 def toggle_wishlist_item(
@@ -476,6 +1044,7 @@ def toggle_wishlist_item(
         raise HTTPException(status_code=404, detail="Item not found")
     item.is_bought = not item.is_bought
     session.add(item)
+    record_change(session, user.id, "wishlist", item.id)
     session.commit()
     session.refresh(item)
     return item
@@ -507,6 +1076,7 @@ def delete_wishlist_item(
     item = session.get(WishlistItem, item_id)
     if not item or item.owner_id != user.id:
         raise HTTPException(status_code=404, detail="Item not found")
+    record_change(session, user.id, "wishlist", item.id, op="delete")
     session.delete(item)
     session.commit()
     return {"ok": True}
@@ -514,6 +1084,423 @@ def delete_wishlist_item(
 # Підключаємо роутер до основного додатку
 app.include_router(wishlist_router)
 
+goals_router = APIRouter()
+
+def months_or_none(months: float) -> Optional[int]:
+    """
+    Converts a forecast month count to JSON, None if the goal is never reached.
+    """
+    return None if months == float("inf") else int(months)
+
+@goals_router.get("/goals/", response_model=List[GoalRead])
+def get_goals(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Returns all savings goals of the authenticated user.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        List[GoalRead]: List of goals owned by the user.
+    """
+    return session.exec(select(Goal).where(Goal.owner_id == user.id)).all()
+
+@goals_router.post("/goals/", response_model=GoalRead)
+def create_goal(
+    data: GoalCreate,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Creates a new savings goal for the authenticated user.
+
+    Args:
+        data (GoalCreate): Data for the new goal.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        GoalRead: The created goal.
+    """
+    goal = Goal(**data.model_dump(), owner_id=user.id)
+    session.add(goal)
+    session.commit()
+    session.refresh(goal)
+    return goal
+
+@goals_router.delete("/goals/{goal_id}")
+def delete_goal(
+    goal_id: int,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Deletes a savings goal by its ID.
+
+    Only the owner of the goal is allowed to delete it.
+
+    Args:
+        goal_id (int): ID of the goal.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        dict: Confirmation message {"ok": True}.
+
+    Raises:
+        HTTPException: If the goal does not exist
+        or does not belong to the current user.
+    """
+    goal = session.get(Goal, goal_id)
+    if not goal or goal.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    session.delete(goal)
+    session.commit()
+    return {"ok": True}
+
+@goals_router.get("/goals/{goal_id}/forecast")
+def get_goal_forecast(
+    goal_id: int,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+    annual_interest: float = Query(default=0.0, gt=-1, le=1),
+    annual_inflation: float = Query(default=0.0, gt=-1, le=1),
+    horizon_months: int = Query(default=120, ge=1, le=600),
+):
+    """
+    Forecasts the goal month by month.
+
+    Savings grow by the monthly contribution and interest,
+    the goal price grows with inflation.
+
+    Args:
+        goal_id (int): ID of the goal.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+        annual_interest (float): Yearly interest on savings, 0.1 = 10%.
+        annual_inflation (float): Yearly growth of the goal price.
+        horizon_months (int): Number of months to forecast.
+
+    Returns:
+        dict: Month when the goal is reached (None if not within
+        the horizon) and the monthly balance and goal trajectories.
+
+    Raises:
+        HTTPException: If the goal does not exist
+        or does not belong to the current user.
+    """
+    goal = session.get(Goal, goal_id)
+    if not goal or goal.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    forecast = forecast_batch(
+        goal.target_amount,
+        goal.current_savings,
+        goal.monthly_contribution,
+        annual_interest,
+        annual_inflation,
+        horizon_months,
+    )
+    return {
+        "months": months_or_none(forecast["months"][0]),
+        "balance": forecast["balance"][0].round(2).tolist(),
+        "goal": forecast["goal"][0].round(2).tolist(),
+    }
+
+@goals_router.post("/goals/{goal_id}/what-if")
+def simulate_goal_scenarios(
+    goal_id: int,
+    data: GoalScenarios,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Evaluates many what-if scenarios for a goal in one batch.
+
+    Lists in the request are broadcast against each other: each must
+    have either one value or as many values as the longest list.
+
+    Args:
+        goal_id (int): ID of the goal.
+        data (GoalScenarios): Purchases, contribution changes,
+            interest and inflation for every scenario.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        dict: Baseline forecast in months and, for every scenario,
+        the forecast and its impact compared to the baseline.
+
+    Raises:
+        HTTPException: If the goal does not exist, does not belong
+        to the current user, or the lists cannot be broadcast.
+    """
+    goal = session.get(Goal, goal_id)
+    if not goal or goal.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    calculator = GoalCalculator(goal.target_amount, goal.monthly_contribution, goal.current_savings)
+    try:
+        forecast = calculator.simulate_scenarios(
+            data.purchase_costs,
+            data.contribution_changes,
+            data.annual_interest,
+            data.annual_inflation,
+            data.horizon_months,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Scenario lists must have equal length or one value")
+
+    baseline = forecast_batch(
+        goal.target_amount, goal.current_savings, goal.monthly_contribution,
+        horizon_months=data.horizon_months,
+    )["months"][0]
+    impact = forecast["months"] - baseline
+
+    scenarios = []
+    for i, months in enumerate(forecast["months"]):
+        scenario = {
+            "months": months_or_none(months),
+            "impact_months": None if not np.isfinite(impact[i]) else int(impact[i]),
+        }
+        if data.include_trajectories:
+            scenario["balance"] = forecast["balance"][i].round(2).tolist()
+        scenarios.append(scenario)
+
+    return {"current_forecast_months": months_or_none(baseline), "scenarios": scenarios}
+
+@goals_router.get("/goals/{goal_id}/probability")
+def get_goal_probability(
+    goal_id: int,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)],
+    horizon_months: int = Query(default=120, ge=1, le=600),
+    paths: int = Query(default=20_000, ge=100, le=1_000_000),
+):
+    """
+    Monte Carlo probability of reaching the goal by each month.
+
+    Monthly net cash flows (income minus expenses) are read from the
+    monthly totals, which include archived transactions, and resampled
+    into random future paths.
+    Results are cached until the goal or the history changes.
+
+    Args:
+        goal_id (int): ID of the goal.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+        horizon_months (int): Number of months to simulate.
+        paths (int): Number of simulated paths.
+
+    Returns:
+        dict: Probability per month and the months when the goal
+        is reached with 50% and 90% probability.
+
+    Raises:
+        HTTPException: If the goal does not exist
+        or does not belong to the current user.
+    """
+    goal = session.get(Goal, goal_id)
+    if not goal or goal.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    rows = [(m.month, m.income - m.expenses) for m in get_monthly_summary(session, user.id)]
+    flows = simulation.fill_monthly_flows(rows)
+
+    # Місячні суми і є версією історії: зміна транзакцій змінює ключ
+    cache_key = (goal.id, goal.target_amount, goal.current_savings, tuple(flows))
+    result = simulation.goal_probability(
+        cache_key, flows, goal.current_savings, goal.target_amount, horizon_months, paths
+    )
+    return {"history_months": len(flows), **result}
+
+app.include_router(goals_router)
+
+recurring_router = APIRouter()
+
+@recurring_router.get("/recurring/", response_model=List[RecurringRead])
+def get_recurring_rules(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Returns the recurring transaction rules of the current user.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        List[RecurringRead]: Rules with the number of created
+        occurrences and the next due date.
+    """
+    return session.exec(select(RecurringRule).where(RecurringRule.user_id == user.id)).all()
+
+@recurring_router.post("/recurring/", response_model=RecurringRead)
+def create_recurring_rule(
+    data: RecurringCreate,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Creates a recurring transaction rule.
+
+    Occurrences already due (start_date in the past) are created
+    right away; later ones are created by the background scheduler.
+
+    Args:
+        data (RecurringCreate): Transaction fields, interval and dates.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        RecurringRead: The created rule.
+
+    Raises:
+        HTTPException: If the dates are invalid or start_date is more
+        than MAX_BACKFILL_DAYS in the past.
+    """
+    try:
+        start = date.fromisoformat(data.start_date)
+        end = date.fromisoformat(data.end_date) if data.end_date else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Dates must be YYYY-MM-DD")
+    if end and end < start:
+        raise HTTPException(status_code=422, detail="end_date must not be before start_date")
+    if start < date.today() - timedelta(days=MAX_BACKFILL_DAYS):
+        # Щоденне правило з 0001-01-01 створило б сотні тисяч транзакцій
+        raise HTTPException(
+            status_code=422,
+            detail=f"start_date must not be more than {MAX_BACKFILL_DAYS} days in the past",
+        )
+
+    rule = RecurringRule(
+        **data.model_dump(exclude={"start_date", "end_date"}),
+        start_date=start.isoformat(),
+        end_date=end.isoformat() if end else None,
+        next_due=start.isoformat(),
+        user_id=user.id,
+    )
+    session.add(rule)
+    session.flush()
+    # Правило і його вже прострочені входження — в одному коміті
+    if rule.next_due <= date.today().isoformat():
+        materialize_rules(session, [rule], date.today().isoformat(), commit=False)
+    session.commit()
+    session.refresh(rule)
+    return rule
+
+@recurring_router.delete("/recurring/{rule_id}")
+def delete_recurring_rule(
+    rule_id: int,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Deletes a recurring rule. Transactions it already created are kept.
+
+    Args:
+        rule_id (int): ID of the rule.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        dict: Confirmation message {"ok": True}.
+
+    Raises:
+        HTTPException: If the rule does not exist
+        or does not belong to the current user.
+    """
+    rule = session.get(RecurringRule, rule_id)
+    if not rule or rule.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Recurring rule not found")
+    session.delete(rule)
+    session.commit()
+    return {"ok": True}
+
+app.include_router(recurring_router)
+
+budgets_router = APIRouter()
+
+@budgets_router.get("/budgets", response_model=List[BudgetStatus])
+def get_budgets(
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Returns the user's budgets with spending in the current period.
+
+    Spent amounts are read from the incrementally maintained monthly
+    and rollup counters, so no transactions are scanned.
+
+    Args:
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        List[BudgetStatus]: Budgets with period bounds, spent and remaining amounts.
+    """
+    budgets = session.exec(select(Budget).where(Budget.user_id == user.id)).all()
+    return [budget_status(session, budget) for budget in budgets]
+
+@budgets_router.post("/budgets", response_model=BudgetStatus)
+def create_budget(
+    data: BudgetCreate,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Creates a spending budget for a category (or all expenses)
+    per week or month.
+
+    Args:
+        data (BudgetCreate): Category, period, limit and alert threshold.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        BudgetStatus: The created budget with its current spending.
+    """
+    budget = Budget(**data.model_dump(), user_id=user.id)
+    session.add(budget)
+    session.commit()
+    session.refresh(budget)
+    return budget_status(session, budget)
+
+@budgets_router.delete("/budgets/{budget_id}")
+def delete_budget(
+    budget_id: int,
+    session: SessionDep,
+    user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Deletes a budget by its ID.
+
+    Args:
+        budget_id (int): ID of the budget.
+        session (Session): Active database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        dict: Confirmation message {"ok": True}.
+
+    Raises:
+        HTTPException: If the budget does not exist
+        or does not belong to the current user.
+    """
+    budget = session.get(Budget, budget_id)
+    if not budget or budget.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    session.delete(budget)
+    session.commit()
+    return {"ok": True}
+
+app.include_router(budgets_router)
+
 
 def send_email(to_email: str, subject: str, body: str):
     """
@@ -635,9 +1622,11 @@ def reset_password(data: ResetPasswordRequest, session: SessionDep):
     if not user:
         raise HTTPException(status_code=400, detail="Invalid user")
 
-    user.hashed_password = get_password_hash(data.new_password)
+    user.hashed_password = password_executor.submit(get_password_hash, data.new_password).result()
     session.add(user)
     session.commit()
+    # Токени, видані до зміни пароля, більше не дійсні
+    revocations.revoke(session, user.username, everywhere=True)
 
     del reset_storage[data.username]
 
@@ -662,6 +1651,103 @@ def clean_expired_reset_codes():
         del reset_storage[username]
 
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Returns application metrics in the Prometheus text format.
+
+    Includes request latency per route, SQL statement timings,
+    connection pool usage, password hash queue depth and
+    currency provider success and latency per URL.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+admin_router = APIRouter(prefix="/admin", dependencies=[Depends(get_admin_user)])
+
+@admin_router.get("/profiling")
+def get_profiling():
+    """
+    Returns the profiling settings and the list of stored profiles.
+
+    Returns:
+        dict: Current settings and profile file names, newest first.
+    """
+    return {"settings": profiling.config.as_dict(), "profiles": profiling.list_profiles()}
+
+@admin_router.put("/profiling")
+def update_profiling(data: ProfilingSettings):
+    """
+    Enables, targets or disables request profiling.
+
+    A sample_rate of 0 disables profiling. username and path_prefix
+    restrict profiling to one user's requests or to one route.
+
+    Args:
+        data (ProfilingSettings): New profiling settings.
+
+    Returns:
+        dict: The applied settings.
+    """
+    profiling.config.sample_rate = data.sample_rate
+    profiling.config.username = data.username
+    profiling.config.path_prefix = data.path_prefix
+    return profiling.config.as_dict()
+
+@admin_router.get("/profiling/{name}")
+def download_profile(name: str):
+    """
+    Downloads a stored profile in the folded stack format.
+
+    The file can be rendered with flamegraph.pl or speedscope.
+
+    Raises:
+        HTTPException: If the profile does not exist.
+    """
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+@admin_router.get("/slow-queries")
+def get_slow_queries(threshold_ms: Optional[float] = Query(default=None, ge=0)):
+    """
+    Returns recent SQL statements slower than the threshold.
+
+    Every entry has the SQL text, parameter types, duration
+    and the SQLite query plan of the statement.
+
+    Args:
+        threshold_ms (float | None): New threshold in milliseconds
+            for statements logged from now on.
+
+    Returns:
+        dict: The threshold and logged statements, newest first.
+    """
+    if threshold_ms is not None:
+        profiling.slow_query_log.threshold_ms = threshold_ms
+    return {
+        "threshold_ms": profiling.slow_query_log.threshold_ms,
+        "queries": list(reversed(profiling.slow_query_log.entries)),
+    }
+
+@admin_router.post("/export")
+def run_analytics_export(workers: Optional[int] = Query(default=None, ge=1, le=32)):
+    """
+    Exports all transactions, wishlist items and goals to Parquet.
+
+    Transactions are partitioned by month and written in parallel
+    by a process pool; see db/export.py for the layout.
+
+    Args:
+        workers (int | None): Number of worker processes.
+
+    Returns:
+        dict: Output directory and exported row counts.
+    """
+    return export_all(engine, workers)
+
+app.include_router(admin_router)
+
 @app.get("/favicon.ico", include_in_schema=False)
 def favicon():
     """
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Annotated, Optional
 from datetime import datetime
 import uuid
 from typing import Literal
@@ -12,6 +12,18 @@ class TransactionBase(BaseModel):
     color: str
     date: str
 
+    @field_validator("date")
+    @classmethod
+    def check_iso_date(cls, value: str) -> str:
+        # Підсумки, rollups, бюджети й експорт покладаються на формат YYYY-MM-DD
+        try:
+            parsed = datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD")
+        if parsed.strftime("%Y-%m-%d") != value:
+            raise ValueError("date must be YYYY-MM-DD")
+        return value
+
 # --- Token ---
 class Token(BaseModel):
     access_token: str
@@ -32,7 +44,13 @@ class UserRead(BaseModel):
 class TransactionCreate(TransactionBase):
     pass
 
-class TransactionRead(TransactionCreate):
+class TransactionRead(BaseModel):
+    # Без перевірки дати: відповіді не повинні падати на старих записах
+    name: str
+    amount: float
+    type: Literal["income", "expenses"]
+    color: str
+    date: str
     id: str
 
 class WishlistCreate(BaseModel):
@@ -45,15 +63,49 @@ class WishlistRead(WishlistCreate):
     id: int
     is_bought: bool
 
+class TransactionChanges(BaseModel):
+    upserted: list[TransactionRead]
+    deleted: list[str]
+
+class WishlistChanges(BaseModel):
+    upserted: list[WishlistRead]
+    deleted: list[int]
+
+class SyncResponse(BaseModel):
+    version: int
+    transactions: TransactionChanges
+    wishlist: WishlistChanges
+
+class WishlistPlanItem(WishlistCreate):
+    id: int
+    cumulative_cost: float
+    months_until_affordable: Optional[int]
+
+class WishlistPlan(BaseModel):
+    balance: float
+    monthly_savings: float
+    items: list[WishlistPlanItem]
+
 # --- Goal CRUD Schemas ---
-# class GoalCreate(BaseModel):
-#     title: str
-#     target_amount: float
-#     monthly_contribution: float
+class GoalCreate(BaseModel):
+    title: str
+    target_amount: float = Field(..., gt=0)
+    monthly_contribution: float
+    current_savings: float = 0
+
+class GoalRead(GoalCreate):
+    id: int
 
-# class GoalRead(GoalCreate):
-#     id: int
-#     current_savings: float
+# Річна ставка: 0.1 = 10%. Не нижче -100% (інакше прогноз дає NaN) і не вище 100%
+AnnualRate = Annotated[float, Field(gt=-1, le=1)]
+
+class GoalScenarios(BaseModel):
+    purchase_costs: list[float] = Field(default_factory=lambda: [0.0], max_length=10000)
+    contribution_changes: list[float] = Field(default_factory=lambda: [0.0], max_length=10000)
+    annual_interest: list[AnnualRate] = Field(default_factory=lambda: [0.0], max_length=10000)
+    annual_inflation: list[AnnualRate] = Field(default_factory=lambda: [0.0], max_length=10000)
+    horizon_months: int = Field(default=120, ge=1, le=600)
+    include_trajectories: bool = False
 
 # --- Goal/Forecast Schemas ---
 #class GoalForecast(BaseModel):
@@ -70,3 +122,49 @@ class ResetPasswordRequest(BaseModel):
     username: str
     code: str
     new_password: str
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float = Field(..., ge=0, le=1)
+    username: Optional[str] = None
+    path_prefix: Optional[str] = None
+
+# --- Currency Conversion Schemas ---
+class ConversionItem(BaseModel):
+    from_currency: str = Field(..., alias="from")
+    to_currency: str = Field(..., alias="to")
+    amount: float
+
+class ConversionRequest(BaseModel):
+    date: Optional[str] = None  # YYYY-MM-DD, сьогодні якщо не задано
+    items: list[ConversionItem] = Field(..., min_length=1, max_length=1000)
+
+# --- Recurring Transaction Schemas ---
+class RecurringCreate(BaseModel):
+    name: str
+    amount: float = Field(..., gt=0)
+    type: Literal["income", "expenses"]
+    color: str
+    interval: Literal["day", "week", "month", "year"]
+    every: int = Field(default=1, ge=1, le=366)
+    start_date: str  # перше входження, YYYY-MM-DD
+    end_date: Optional[str] = None
+
+class RecurringRead(RecurringCreate):
+    id: int
+    occurrences: int
+    next_due: Optional[str]
+
+# --- Budget Schemas ---
+class BudgetCreate(BaseModel):
+    category: Optional[str] = None  # назва транзакції; None — усі витрати
+    period: Literal["week", "month"]
+    limit_amount: float = Field(..., gt=0)
+    alert_threshold: float = Field(default=0.8, gt=0, le=1)
+
+class BudgetStatus(BudgetCreate):
+    id: int
+    period_start: str
+    period_end: str
+    spent: float
+    remaining: float
+    used: float
@@ -4,8 +4,75 @@ Module: goal_calculator
 This module provides the GoalCalculator class for estimating
 the time required to reach a financial goal based on current
 savings, monthly contributions, and possible scenario changes.
+
+forecast_batch evaluates many scenarios at once with NumPy,
+including interest on savings and inflation of the goal price.
 '''
 from typing import Optional
+
+import numpy as np
+
+MAX_FORECAST_MONTHS = 600
+
+
+def forecast_batch(
+    target_amount,
+    current_savings,
+    monthly_contribution,
+    annual_interest=0.0,
+    annual_inflation=0.0,
+    horizon_months: int = MAX_FORECAST_MONTHS,
+) -> dict:
+    '''
+    Forecasts many savings scenarios in one vectorized computation.
+
+    Every argument except horizon_months may be a number or an array;
+    they are broadcast to a common shape (n,). Savings grow with monthly
+    compounded interest and the goal price grows with inflation:
+
+        balance[t] = savings * g**t + contribution * (g**t - 1) / (g - 1)
+        goal[t]    = target * (1 + inflation_monthly)**t
+
+    :param target_amount: Goal price today.
+    :param current_savings: Amount already saved.
+    :param monthly_contribution: Amount added at the end of each month.
+    :param annual_interest: Yearly interest on savings, 0.1 = 10%.
+    :param annual_inflation: Yearly growth of the goal price.
+    :param horizon_months: Number of months to simulate.
+    :return: dict with arrays "months" (n,), month when the goal is
+             reached or inf, "balance" and "goal" (n, horizon_months + 1).
+    '''
+    target, savings, contribution, interest, inflation = (
+        a.astype(float) for a in np.broadcast_arrays(
+            np.atleast_1d(target_amount),
+            np.atleast_1d(current_savings),
+            np.atleast_1d(monthly_contribution),
+            np.atleast_1d(annual_interest),
+            np.atleast_1d(annual_inflation),
+        )
+    )
+    t = np.arange(horizon_months + 1, dtype=float)
+
+    # Ставок зазвичай кілька на тисячі сценаріїв: рахуємо g**t лише для унікальних
+    rates, rate_index = np.unique((1 + interest) ** (1 / 12) - 1, return_inverse=True)
+    rate_growth = np.exp(np.outer(np.log1p(rates), t))
+    rate_annuity = np.where(
+        (rates == 0)[:, None],
+        t,
+        (rate_growth - 1) / np.where(rates == 0, 1.0, rates)[:, None],
+    )
+    balance = (
+        savings[:, None] * rate_growth[rate_index]
+        + contribution[:, None] * rate_annuity[rate_index]
+    )
+
+    monthly_inflation, inflation_index = np.unique(np.log1p(inflation) / 12, return_inverse=True)
+    goal = target[:, None] * np.exp(np.outer(monthly_inflation, t))[inflation_index]
+
+    reached = balance >= goal
+    months = np.where(reached.any(axis=1), reached.argmax(axis=1), np.inf)
+    return {"months": months, "balance": balance, "goal": goal}
+
 class GoalCalculator:
     '''
     Calculates how long it will take to reach a savings goal and
@@ -64,3 +131,25 @@ class GoalCalculator:
                 else f"Ціль буде досягнута на {abs(delay)} місяців раніше"
             )
         }
+
+    def simulate_scenarios(
+        self,
+        purchase_costs=0,
+        contribution_changes=0,
+        annual_interest=0.0,
+        annual_inflation=0.0,
+        horizon_months: int = MAX_FORECAST_MONTHS,
+    ) -> dict:
+        """
+        Пакетне моделювання сценаріїв.
+        Аналог simulate_what_if для масивів покупок і змін внеску,
+        всі сценарії рахуються одним викликом forecast_batch.
+        """
+        return forecast_batch(
+            self.target_amount,
+            self.current_savings - np.asarray(purchase_costs, dtype=float),
+            self.monthly_contribution + np.asarray(contribution_changes, dtype=float),
+            annual_interest,
+            annual_inflation,
+            horizon_months,
+        )
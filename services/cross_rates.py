@@ -0,0 +1,74 @@
+"""
+services/cross_rates.py
+
+Матриця крос-курсів для конвертації між будь-якими валютами.
+
+The matrix is built once per rates refresh from UAH prices per single
+unit (the per-`amount` scaling of CURRENCY_META is removed), so a
+conversion is a lookup and a multiplication. `rate[i, j]` is how many
+units of currency j one unit of currency i is worth at the mid rate;
+`bank_rate[i, j]` sells i at the buy price and buys j at the sell price.
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+BASE = "UAH"
+
+
+class CrossRates:
+    def __init__(self, buy: dict[str, float], sell: dict[str, float]):
+        self.codes = [BASE] + sorted(buy)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        buy_uah = np.array([1.0] + [buy[c] for c in self.codes[1:]])
+        sell_uah = np.array([1.0] + [sell[c] for c in self.codes[1:]])
+        mid = (buy_uah + sell_uah) / 2
+        self.rate = mid[:, None] / mid[None, :]
+        self.bank_rate = buy_uah[:, None] / sell_uah[None, :]
+        np.fill_diagonal(self.bank_rate, 1.0)
+
+    @classmethod
+    def from_rates(cls, rates: dict, meta: dict) -> "CrossRates":
+        """From display rates: buy/sell in UAH per `meta[code]['amount']` units."""
+        per_unit = {code: meta[code]["amount"] for code in rates if code in meta}
+        return cls(
+            {code: rates[code]["buy"] / amount for code, amount in per_unit.items()},
+            {code: rates[code]["sell"] / amount for code, amount in per_unit.items()},
+        )
+
+    @classmethod
+    def from_mid(cls, mid: dict[str, float], spread: float) -> "CrossRates":
+        """From mid rates in UAH per unit, with a symmetric spread."""
+        return cls(
+            {code: rate * (1 - spread) for code, rate in mid.items()},
+            {code: rate * (1 + spread) for code, rate in mid.items()},
+        )
+
+    def convert(self, items: Iterable[tuple[str, str, float]]) -> list[dict]:
+        """
+        Converts (from, to, amount) triples in one vectorized pass.
+
+        Raises:
+            KeyError: If a currency code is unknown.
+        """
+        items = list(items)
+        if not items:
+            return []
+        src = np.array([self.index[f.upper()] for f, _, _ in items])
+        dst = np.array([self.index[t.upper()] for _, t, _ in items])
+        amounts = np.array([a for _, _, a in items], dtype=np.float64)
+        rates = self.rate[src, dst]
+        results = amounts * rates
+        bank_results = amounts * self.bank_rate[src, dst]
+        return [
+            {
+                "from": self.codes[s],
+                "to": self.codes[d],
+                "amount": float(a),
+                "rate": round(float(r), 6),
+                "result": round(float(x), 4),
+                "bank_result": round(float(b), 4),
+            }
+            for s, d, a, r, x, b in zip(src, dst, amounts, rates, results, bank_results)
+        ]
@@ -6,11 +6,23 @@ services/currency_service.py
 """
 
 import asyncio
+import json
+import os
+import time
 import httpx
-from datetime import datetime
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
 from typing import Optional
 
+from services import metrics
+from services.rate_history import IntradayHistory
+from services.cross_rates import CrossRates
+
 SPREAD = 0.015  # 1.5%
+RATES_CACHE_PATH = Path(os.getenv("CURRENCY_CACHE_PATH", "currency_rates.json"))
+HISTORY_DAYS = 400  # скільки днів історичних курсів зберігати для конвертації
+OLD_DAYS_CACHE = 64  # старіші за історію дні, завантажені на запит (LRU, без збереження)
 
 CURRENCY_META = {
     "USD": {"flag": "🇺🇸", "amount": 1},
@@ -36,16 +48,60 @@ DEFAULT_RATES = {
 class CurrencyService:
     def __init__(self):
         self.current_rates: dict = {}
-        self.previous_rates: dict = {}
+        # Внутрішньоденні спостереження курсів (лише з відповідей провайдерів)
+        self.intraday = IntradayHistory()
         self.last_update: Optional[datetime] = None
         self._task: Optional[asyncio.Task] = None
+        # Можна підмінити (напр. httpx.MockTransport) у бенчмарках
+        self.transport: Optional[httpx.AsyncBaseTransport] = None
+        # "upstream" | "cache" | "default" — звідки взяті поточні курси
+        self.source: str = "default"
+        # True після першої спроби оновлення (успішної чи ні)
+        self.warmed_up: bool = False
+        # Матриця крос-курсів, перераховується при кожному оновленні курсів
+        self.cross_rates: Optional[CrossRates] = None
+        # Курси НБУ за днями: {"YYYY-MM-DD": {"USD": грн за 1 одиницю, ...}}.
+        # Лише повні таблиці дня (оновлення курсів або _fetch_day)
+        self.daily_rates: dict[str, dict[str, float]] = {}
+        self._daily_matrices: dict[str, CrossRates] = {}
+        # Дні, старіші за повну історію: в daily_rates їх одразу витіснило б
+        self._old_days: "OrderedDict[str, Optional[CrossRates]]" = OrderedDict()
+
+    def load_cached(self):
+        """
+        Завантажує останні збережені курси (або DEFAULT_RATES),
+        щоб застосунок міг відповідати ще до звернення до провайдерів.
+        """
+        try:
+            cached = json.loads(RATES_CACHE_PATH.read_text())
+            self.current_rates = cached["rates"]
+            last_update = cached["last_update"]
+            self.last_update = datetime.fromisoformat(last_update) if last_update else None
+            self.daily_rates = cached.get("history", {})
+            self.source = "cache"
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[CurrencyService] No cached rates, using defaults: {e}")
+            self.current_rates = DEFAULT_RATES
+            self.last_update = None
+            self.source = "default"
+        self.cross_rates = CrossRates.from_rates(self.current_rates, CURRENCY_META)
+
+    def _save_cache(self):
+        try:
+            RATES_CACHE_PATH.write_text(json.dumps({
+                "rates": self.current_rates,
+                # None до першого успішного оновлення (старт із DEFAULT_RATES)
+                "last_update": self.last_update.isoformat() if self.last_update else None,
+                "history": self.daily_rates,
+            }, ensure_ascii=False))
+        except OSError as e:
+            print(f"[CurrencyService] Could not save rates cache: {e}")
 
     def _calculate_trend(self, code: str, rate: float) -> str:
-        if code not in self.previous_rates:
-            self.previous_rates[code] = rate
+        prev = self.intraday.last(code)
+        self.intraday.record(code, rate)
+        if prev is None:
             return "neutral"
-        prev = self.previous_rates[code]
-        self.previous_rates[code] = rate
         if rate > prev:
             return "up"
         elif rate < prev:
@@ -71,17 +127,94 @@ class CurrencyService:
                 "trend": trend,
             }
         self.current_rates = result
+        self.cross_rates = CrossRates.from_rates(result, CURRENCY_META)
         self.last_update = datetime.now()
+        self.source = "upstream"
+        self._record_day(date.today(), {
+            code: 1 / raw_rates[code] for code in result
+        })
+        self._save_cache()
         return result
 
+    def _record_day(self, day: date, mid: dict[str, float]):
+        """Зберігає курси дня (грн за 1 одиницю) для історичної конвертації."""
+        key = day.isoformat()
+        self.daily_rates[key] = {**self.daily_rates.get(key, {}), **mid}
+        self._daily_matrices.pop(key, None)
+        for old in sorted(self.daily_rates)[:-HISTORY_DAYS]:
+            del self.daily_rates[old]
+            self._daily_matrices.pop(old, None)
+
+    async def cross_rates_on(self, day: date) -> Optional[CrossRates]:
+        """
+        Матриця крос-курсів на дату. Для сьогодні — поточна, для інших
+        днів будується зі збереженої історії; якщо дня в історії немає,
+        курси за нього один раз завантажуються з НБУ.
+        """
+        if day >= date.today():
+            return self.cross_rates
+        key = day.isoformat()
+        if key not in self.daily_rates and key not in self._old_days:
+            await self._fetch_day(day)
+        if key in self._old_days:
+            self._old_days.move_to_end(key)
+            return self._old_days[key]
+        if not self.daily_rates.get(key):
+            return None
+        if key not in self._daily_matrices:
+            self._daily_matrices[key] = CrossRates.from_mid(self.daily_rates[key], SPREAD)
+        return self._daily_matrices[key]
+
+    async def _fetch_day(self, day: date):
+        url = (
+            "https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange"
+            f"?date={day.strftime('%Y%m%d')}&json"
+        )
+        try:
+            async with httpx.AsyncClient(timeout=5, transport=self.transport) as client:
+                resp = await self._get(client, url)
+                if resp.status_code != 200:
+                    return
+                mid = {
+                    item["cc"]: item["rate"]
+                    for item in resp.json()
+                    if item.get("rate") and item.get("cc") in CURRENCY_META
+                }
+        except Exception as e:
+            print(f"[CurrencyService] Error fetching rates for {day}: {e}")
+            return
+        # Порожня відповідь теж запам'ятовується, щоб не питати НБУ повторно
+        key = day.isoformat()
+        if len(self.daily_rates) >= HISTORY_DAYS and key < min(self.daily_rates):
+            self._old_days[key] = CrossRates.from_mid(mid, SPREAD) if mid else None
+            if len(self._old_days) > OLD_DAYS_CACHE:
+                self._old_days.popitem(last=False)
+            return
+        self._record_day(day, mid)
+        if mid:
+            self._save_cache()
+
+
+    async def _get(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        """GET до провайдера курсів із записом метрик успішності та часу."""
+        started = time.perf_counter()
+        try:
+            resp = await client.get(url)
+        except Exception:
+            metrics.currency_fetch_total.inc(url, "error")
+            raise
+        finally:
+            metrics.currency_fetch_duration.observe(time.perf_counter() - started, url)
+        metrics.currency_fetch_total.inc(url, "ok" if resp.status_code == 200 else f"http_{resp.status_code}")
+        return resp
 
     async def fetch_rates(self, force_update: bool = False) -> dict:
         if not force_update and self.current_rates:
             return self.current_rates
 
-        async with httpx.AsyncClient(timeout=5) as client:
+        async with httpx.AsyncClient(timeout=5, transport=self.transport) as client:
             try:
-                resp = await client.get("https://bank.gov.ua/NBU_Exchange/exchange_site?json")
+                resp = await self._get(client, "https://bank.gov.ua/NBU_Exchange/exchange_site?json")
                 if resp.status_code == 200:
                     data = resp.json()
                     # NBU: rate = UAH per 1 foreign unit → invert for _format
@@ -100,7 +233,7 @@ class CurrencyService:
                 "https://open.er-api.com/v6/latest/UAH",
             ]:
                 try:
-                    resp = await client.get(url)
+                    resp = await self._get(client, url)
                     if resp.status_code == 200:
                         data = resp.json()
                         raw = data.get("rates") or data.get("conversion_rates", {})
@@ -109,9 +242,12 @@ class CurrencyService:
                 except Exception as e:
                     print(f"[CurrencyService] Error fetching {url}: {e}")
 
-        self.current_rates = DEFAULT_RATES
-        self.last_update = datetime.now()
-        return DEFAULT_RATES
+        # Усі провайдери недоступні: лишаємо останні відомі курси
+        if not self.current_rates:
+            self.current_rates = DEFAULT_RATES
+            self.cross_rates = CrossRates.from_rates(DEFAULT_RATES, CURRENCY_META)
+            self.last_update = datetime.now()
+        return self.current_rates
     
     async def fetch_history(self, code: str, days: int = 10) -> list[dict]:
         from datetime import timedelta
@@ -123,7 +259,7 @@ class CurrencyService:
             f"&end={end.strftime('%Y%m%d')}"
             f"&valcode={code.lower()}&json"
         )
-        async with httpx.AsyncClient(timeout=5) as client:
+        async with httpx.AsyncClient(timeout=5, transport=self.transport) as client:
             resp = await client.get(url)
             data = resp.json()
             return [
@@ -138,14 +274,18 @@ class CurrencyService:
     async def _auto_update_loop(self):
         while True:
             try:
-                await self.fetch_rates()
-                print(f"[CurrencyService] ✓ Updated at {self.last_update.strftime('%H:%M:%S')}")
+                await self.fetch_rates(force_update=True)
+                print(f"[CurrencyService] ✓ Updated ({self.source})")
             except Exception as e:
                 print(f"[CurrencyService] ✗ Error: {e}")
+            self.warmed_up = True
             await asyncio.sleep(30)
 
     def start(self):
-        """Запускає фонове оновлення. Викликати з lifespan."""
+        """
+        Запускає фонове оновлення. Викликати з lifespan.
+        Перше оновлення (прогрів кешу) виконується одразу у фоні.
+        """
         self._task = asyncio.create_task(self._auto_update_loop())
 
     def stop(self):
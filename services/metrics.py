@@ -0,0 +1,238 @@
+"""
+services/metrics.py
+
+Метрики у текстовому форматі Prometheus без сторонніх залежностей.
+
+Counters and histograms are sharded per thread: every thread writes only
+to its own dict, so recording a value takes no lock. Shards are summed
+when /metrics is scraped. When a thread exits (anyio prunes idle worker
+threads), its shard is folded into a retired total, so the number of
+shards stays bounded by the live threads. Gauges are callbacks evaluated
+at scrape time.
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY: list = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _ThreadToken:
+    """Lives in a thread-local; collected when its thread exits."""
+
+
+class _ShardedMetric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._retired: dict = {}  # сума шардів потоків, що вже завершились
+        # RLock: finalize може спрацювати в потоці, що вже тримає блокування
+        self._shards_lock = threading.RLock()
+        REGISTRY.append(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            # Один раз на потік: реєструємо його власний шард
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            self._local.token = token = _ThreadToken()
+            weakref.finalize(token, self._retire, shard)
+            return shard
+
+    def _retire(self, shard: dict):
+        """Folds the shard of an exited thread into the retired total."""
+        with self._shards_lock:
+            self._merge(self._retired, shard)
+            self._shards.remove(shard)
+
+    def _merge(self, totals: dict, shard: dict):
+        raise NotImplementedError
+
+    def collect(self) -> dict:
+        totals = {}
+        with self._shards_lock:
+            self._merge(totals, self._retired)
+            for shard in list(self._shards):
+                self._merge(totals, shard)
+        return totals
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_ShardedMetric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+        shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0) + amount
+
+    def _merge(self, totals: dict, shard: dict):
+        for key, value in list(shard.items()):
+            totals[key] = totals.get(key, 0) + value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram(_ShardedMetric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *label_values):
+        shard = self._shard()
+        entry = shard.get(label_values)
+        if entry is None:
+            # [лічильники кошиків..., +Inf, сума]
+            entry = shard[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def _merge(self, totals: dict, shard: dict):
+        for key, entry in list(shard.items()):
+            total = totals.setdefault(key, [0] * len(entry))
+            for i, value in enumerate(entry):
+                total[i] += value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, entry in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), entry[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {entry[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        REGISTRY.append(self)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            f"{self.name} {self.callback()}",
+        ]
+
+
+def render() -> str:
+    """Повертає всі метрики у текстовому форматі Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ("statement",)
+)
+currency_fetch_duration = Histogram(
+    "currency_fetch_duration_seconds", "Currency provider request latency.", ("url",)
+)
+currency_fetch_total = Counter(
+    "currency_fetch_total", "Currency provider requests by outcome.", ("url", "outcome")
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records request latency per route template.
+
+    The route is taken from the matched FastAPI route, so /transactions/{tx_id}
+    is one series regardless of the id. Unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status["code"],
+            )
+
+
+def instrument_engine(engine):
+    """
+    Records the duration of every SQL statement executed by `engine`
+    and exposes connection pool usage as gauges.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_duration.observe(time.perf_counter() - started, verb)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    pool = engine.pool
+    Gauge("db_pool_checked_out", "Connections currently checked out.", pool.checkedout)
+    Gauge("db_pool_size", "Configured pool size.", pool.size)
+    Gauge("db_pool_overflow", "Connections above pool size.", pool.overflow)
@@ -0,0 +1,237 @@
+"""
+services/profiling.py
+
+Профілювання запитів на вимогу та журнал повільних SQL-запитів.
+
+ProfilingMiddleware samples the Python stacks of a fraction of requests
+(optionally only for one user or path prefix) and writes them in the
+folded format understood by flamegraph.pl and speedscope. Sampling runs
+in a background thread, so profiled handlers are not instrumented.
+While a profiled request is in flight every thread running project code
+is sampled, so concurrent requests may add samples to the same profile.
+
+install_slow_query_log records every statement slower than a threshold
+with its parameter shape and SQLite EXPLAIN QUERY PLAN.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+SAMPLE_INTERVAL = 0.005
+MAX_PROFILES = 100
+
+
+class ProfilingConfig:
+    """Які запити профілювати. Змінюється через адмінський ендпоінт."""
+
+    def __init__(self):
+        self.sample_rate: float = 0.0
+        self.username: Optional[str] = None
+        self.path_prefix: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "username": self.username,
+            "path_prefix": self.path_prefix,
+        }
+
+
+config = ProfilingConfig()
+
+_active: list[Counter] = []
+_active_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = filename[len(PROJECT_ROOT) + 1:]
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _sample_loop():
+    global _sampler
+    me = threading.get_ident()
+    while True:
+        with _active_lock:
+            if not _active:
+                _sampler = None
+                return
+            targets = list(_active)
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            in_project = False
+            while frame is not None:
+                in_project = in_project or frame.f_code.co_filename.startswith(PROJECT_ROOT)
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if in_project:
+                folded = ";".join(reversed(stack))
+                for samples in targets:
+                    samples[folded] += 1
+        time.sleep(SAMPLE_INTERVAL)
+
+
+def _start(samples: Counter):
+    global _sampler
+    with _active_lock:
+        _active.append(samples)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="profiler", daemon=True)
+            _sampler.start()
+
+
+def _stop(samples: Counter):
+    with _active_lock:
+        _active.remove(samples)
+
+
+def _save(samples: Counter, method: str, path: str, username: Optional[str], duration: float):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    safe_path = path.strip("/").replace("/", "_") or "root"
+    name = f"{datetime.now():%Y%m%d_%H%M%S_%f}_{method}_{safe_path}_{username or 'anon'}.folded"
+    lines = [f"{stack} {count}" for stack, count in samples.most_common()]
+    (PROFILE_DIR / name).write_text("\n".join(lines) + "\n")
+    print(f"[profiling] {method} {path} {duration * 1000:.1f}ms -> {name}")
+
+    profiles = sorted(PROFILE_DIR.glob("*.folded"))
+    for old in profiles[:-MAX_PROFILES]:
+        old.unlink(missing_ok=True)
+
+
+def list_profiles() -> list[str]:
+    """Імена збережених профілів, найновіші першими."""
+    if not PROFILE_DIR.exists():
+        return []
+    return sorted((p.name for p in PROFILE_DIR.glob("*.folded")), reverse=True)
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """Шлях до профілю або None, якщо такого немає."""
+    if name not in list_profiles():
+        return None
+    return PROFILE_DIR / name
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests selected by `config`.
+
+    `identify(scope)` returns the username of the request (or None);
+    it is only called when profiling is targeted at a user.
+    """
+
+    def __init__(self, app, identify: Callable[[dict], Optional[str]] = lambda scope: None):
+        self.app = app
+        self.identify = identify
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or config.sample_rate <= 0:
+            await self.app(scope, receive, send)
+            return
+        if config.path_prefix and not scope["path"].startswith(config.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        username = None
+        if config.username:
+            username = self.identify(scope)
+            if username != config.username:
+                await self.app(scope, receive, send)
+                return
+        if random.random() >= config.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        samples = Counter()
+        _start(samples)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _stop(samples)
+            _save(samples, scope["method"], scope["path"], username, time.perf_counter() - started)
+
+
+class SlowQueryLog:
+    """Останні повільні SQL-запити з планами виконання."""
+
+    def __init__(self, threshold_ms: float, maxlen: int = 200):
+        self.threshold_ms = threshold_ms
+        self.entries: deque = deque(maxlen=maxlen)
+        self._plans: dict[str, list[str]] = {}
+
+    @staticmethod
+    def parameters_shape(parameters) -> str:
+        """Describes parameters by type only, so values are not logged."""
+        if isinstance(parameters, dict):
+            return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+        if isinstance(parameters, (list, tuple)):
+            return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+        return type(parameters).__name__
+
+    def explain(self, dbapi_connection, statement: str, parameters) -> list[str]:
+        if statement in self._plans:
+            return self._plans[statement]
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {e}"]
+        finally:
+            cursor.close()
+        if len(self._plans) < 1000:
+            self._plans[statement] = plan
+        return plan
+
+    def record(self, conn, statement: str, parameters, duration: float, executemany: bool):
+        plan = []
+        if conn.dialect.name == "sqlite" and not executemany:
+            plan = self.explain(conn.connection.dbapi_connection, statement, parameters)
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(duration * 1000, 2),
+            "sql": " ".join(statement.split()),
+            "parameters": self.parameters_shape(parameters),
+            "executemany": executemany,
+            "plan": plan,
+        }
+        self.entries.append(entry)
+        print(f"[slow query] {entry['duration_ms']}ms {entry['sql'][:200]} | plan: {'; '.join(plan)}")
+
+
+slow_query_log = SlowQueryLog(threshold_ms=float(os.getenv("SLOW_QUERY_MS", 100)))
+
+
+def install_slow_query_log(engine):
+    """Підключає журнал повільних запитів до подій engine."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["slow_query_started"].pop()
+        if duration * 1000 >= slow_query_log.threshold_ms:
+            slow_query_log.record(conn, statement, parameters, duration, executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("slow_query_started"):
+            context.connection.info["slow_query_started"].pop()
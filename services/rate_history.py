@@ -0,0 +1,172 @@
+"""
+services/rate_history.py
+
+Внутрішньоденна історія курсів у кільцевому буфері.
+
+Every currency keeps the last INTRADAY_CAPACITY observations in
+preallocated numpy arrays. Moving averages, the min/max of the buffer
+and the volatility of log returns are maintained incrementally:
+each new sample updates running sums and monotonic deques in O(1)
+(amortized for min/max), so reading the statistics never rescans.
+"""
+
+import math
+import os
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+INTRADAY_CAPACITY = int(os.getenv("INTRADAY_CAPACITY", 2880))  # 24 год по 30 с
+MOVING_AVERAGE_WINDOWS = (10, 60, 360)  # 5 хв, 30 хв, 3 год по 30 с
+
+
+class _RunningWindow:
+    """Sum and sum of squares over the last `size` values pushed."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.total = 0.0
+        self.squares = 0.0
+
+    def update(self, added: float, removed: Optional[float]):
+        self.total += added
+        self.squares += added * added
+        if removed is not None:
+            self.total -= removed
+            self.squares -= removed * removed
+
+
+class RateRing:
+    """Fixed-size ring buffer of (timestamp, rate) for one currency."""
+
+    def __init__(self, capacity: int = INTRADAY_CAPACITY, windows: tuple = MOVING_AVERAGE_WINDOWS):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.returns = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # усього доданих значень, позиція = count % capacity
+        self.windows = [_RunningWindow(min(w, capacity)) for w in windows]
+        self.return_window = _RunningWindow(capacity - 1)
+        # Монотонні черги (номер, значення) для min/max у вікні буфера
+        self._min: deque = deque()
+        self._max: deque = deque()
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def last(self) -> Optional[float]:
+        return float(self.values[(self.count - 1) % self.capacity]) if self.count else None
+
+    def _value_ago(self, n: int) -> Optional[float]:
+        """Value pushed n samples before the newest one, if still buffered."""
+        if n >= self.count or n >= self.capacity:
+            return None
+        return float(self.values[(self.count - 1 - n) % self.capacity])
+
+    def push(self, value: float, timestamp: Optional[float] = None):
+        value = float(value)
+        previous = self.last
+        seq = self.count
+        i = seq % self.capacity
+        # Значення, що виходять із вікон, читаємо до перезапису комірки
+        leaving = [
+            float(self.values[(seq - w.size) % self.capacity]) if seq >= w.size else None
+            for w in self.windows
+        ]
+        # Доходність найстарішого значення, що лишається, теж виходить із вікна
+        leaving_return = float(self.returns[(seq + 1) % self.capacity]) if seq >= self.capacity else None
+        log_return = math.log(value / previous) if previous and value > 0 else 0.0
+
+        self.timestamps[i] = time.time() if timestamp is None else timestamp
+        self.values[i] = value
+        self.returns[i] = log_return
+        self.count += 1
+
+        for window, removed in zip(self.windows, leaving):
+            window.update(value, removed)
+        # Перше значення не має доходності
+        if seq > 0:
+            self.return_window.update(log_return, leaving_return)
+
+        oldest = self.count - self.capacity
+        for queue, better in ((self._min, float.__le__), (self._max, float.__ge__)):
+            while queue and better(value, queue[-1][1]):
+                queue.pop()
+            queue.append((seq, value))
+            while queue[0][0] < oldest:
+                queue.popleft()
+
+        if self.count % self.capacity == 0:
+            self._resync()
+
+    def _resync(self):
+        """
+        Recomputes running sums from the buffer once per full cycle,
+        so floating point error of add/subtract does not accumulate.
+        """
+        ordered = np.roll(self.values, -(self.count % self.capacity))
+        for window in self.windows:
+            tail = ordered[-window.size:]
+            window.total = float(tail.sum())
+            window.squares = float((tail * tail).sum())
+        returns = self.returns.copy()
+        # Доходність найстарішого значення у буфері вже не входить у вікно
+        returns[self.count % self.capacity] = 0.0
+        self.return_window.total = float(returns.sum())
+        self.return_window.squares = float((returns * returns).sum())
+
+    def stats(self) -> dict:
+        """Current statistics; O(number of windows)."""
+        n = len(self)
+        if not n:
+            return {"samples": 0}
+        moving_averages = {}
+        for window in self.windows:
+            filled = min(self.count, window.size)
+            moving_averages[str(window.size)] = round(window.total / filled, 6)
+
+        returns = n - 1
+        volatility = 0.0
+        if returns > 1:
+            mean = self.return_window.total / returns
+            variance = max(self.return_window.squares / returns - mean * mean, 0.0)
+            volatility = math.sqrt(variance * returns / (returns - 1))
+
+        first = self._value_ago(n - 1)
+        return {
+            "samples": n,
+            "last": round(self.last, 6),
+            "change": round(self.last - first, 6),
+            "min": round(self._min[0][1], 6),
+            "max": round(self._max[0][1], 6),
+            "moving_averages": moving_averages,
+            "volatility": round(volatility, 8),
+            "since": float(self.timestamps[(self.count - n) % self.capacity]),
+        }
+
+    def series(self, points: int) -> list[list[float]]:
+        """The newest `points` samples as [timestamp, rate] pairs, oldest first."""
+        n = min(points, len(self))
+        idx = (np.arange(self.count - n, self.count)) % self.capacity
+        return np.column_stack((self.timestamps[idx], self.values[idx])).round(6).tolist()
+
+
+class IntradayHistory:
+    """Кільцеві буфери для всіх валют."""
+
+    def __init__(self, capacity: int = INTRADAY_CAPACITY):
+        self.capacity = capacity
+        self.rings: dict[str, RateRing] = {}
+
+    def record(self, code: str, value: float, timestamp: Optional[float] = None):
+        ring = self.rings.get(code)
+        if ring is None:
+            ring = self.rings[code] = RateRing(self.capacity)
+        ring.push(value, timestamp)
+
+    def last(self, code: str) -> Optional[float]:
+        ring = self.rings.get(code)
+        return ring.last if ring else None
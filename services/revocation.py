@@ -0,0 +1,100 @@
+"""
+services/revocation.py
+
+Відкликання JWT токенів на сервері.
+
+A token is revoked either by its `jti` (logout) or because it was
+issued before the user's "not before" time (logout everywhere,
+password reset). Both live in memory — a dict of revoked jtis and a
+dict of per-user not-before times — so a check is two dict lookups.
+Revocations are stored in `token_revocations`; every worker applies
+new rows from the table at most every REVOCATION_SYNC_SECONDS, which
+is how revocations made by other workers reach this one.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from db.models import TokenRevocation
+
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", 5))
+
+
+class RevocationList:
+    def __init__(self, token_lifetime_seconds: float, sync_seconds: float = REVOCATION_SYNC_SECONDS):
+        self.token_lifetime = token_lifetime_seconds
+        self.sync_seconds = sync_seconds
+        self.engine = None
+        self.revoked_jtis: dict[str, float] = {}  # jti -> expires_at
+        self.not_before: dict[str, float] = {}  # username -> iat, з якого токени дійсні
+        self._last_id = 0
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, engine):
+        """Видаляє прострочені записи і завантажує решту. Викликати з lifespan."""
+        self.engine = engine
+        with Session(engine) as session:
+            session.execute(delete(TokenRevocation).where(TokenRevocation.expires_at < time.time()))
+            session.commit()
+        self.sync(force=True)
+
+    def sync(self, force: bool = False):
+        """Applies rows added since the last sync, also by other workers."""
+        now = time.time()
+        if self.engine is None or (not force and now < self._next_sync):
+            return
+        if not self._lock.acquire(blocking=force):
+            return  # інший потік уже синхронізує
+        try:
+            self._next_sync = now + self.sync_seconds
+            with Session(self.engine) as session:
+                rows = session.exec(
+                    select(TokenRevocation)
+                    .where(TokenRevocation.id > self._last_id)
+                    .order_by(TokenRevocation.id)
+                ).all()
+            for row in rows:
+                self._apply(row.username, row.jti, row.not_before, row.expires_at)
+                self._last_id = row.id
+            if rows:
+                self.revoked_jtis = {
+                    jti: expires for jti, expires in self.revoked_jtis.items() if expires > now
+                }
+        finally:
+            self._lock.release()
+
+    def _apply(self, username: str, jti: Optional[str], not_before: float, expires_at: float):
+        if jti:
+            self.revoked_jtis[jti] = expires_at
+        if not_before > self.not_before.get(username, 0.0):
+            self.not_before[username] = not_before
+
+    def is_revoked(self, payload: dict) -> bool:
+        """Checks a decoded token; costs two dict lookups between syncs."""
+        self.sync()
+        if payload.get("jti") in self.revoked_jtis:
+            return True
+        not_before = self.not_before.get(payload.get("sub"))
+        return not_before is not None and payload.get("iat", 0) < not_before
+
+    def revoke(self, session: Session, username: str, jti: Optional[str] = None, everywhere: bool = False):
+        """
+        Revokes one token (`jti`) and, with `everywhere`, every token
+        of the user issued until now. Commits the session.
+        """
+        now = time.time()
+        values = {
+            "username": username,
+            "jti": jti,
+            "not_before": now if everywhere else 0.0,
+            "expires_at": now + self.token_lifetime,
+        }
+        session.add(TokenRevocation(**values))
+        session.commit()
+        self._apply(**values)
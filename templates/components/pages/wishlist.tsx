@@ -13,18 +13,16 @@ interface WishlistItem {
   is_bought: boolean;
 }
 
-interface Transaction {
-  id: string;
-  amount: number;
-  type: 'income' | 'expenses';
-  date: string;
+interface WishlistPlan {
+  balance: number;
+  monthly_savings: number;
+  items: { id: number; months_until_affordable: number | null }[];
 }
 
 // ... решта імпортів та інтерфейсів як раніше
 
 export function Wishlist() {
   const [items, setItems] = useState<WishlistItem[]>([]);
-  const [transactions, setTransactions] = useState<Transaction[]>([]);
   const [showModal, setShowModal] = useState(false);
   const [newItemName, setNewItemName] = useState('');
   const [newItemAmount, setNewItemAmount] = useState('');
@@ -40,51 +38,23 @@ export function Wishlist() {
     setItems(res.data);
   };
 
-  // --- Fetch transactions
-  const fetchTransactions = async () => {
-    const res = await axios.get('/transactions/', {
+  // --- Прогноз рахує сервер: баланс і середні заощадження з місячних підсумків
+  const fetchPlan = async () => {
+    const res = await axios.get<WishlistPlan>('/wishlist/plan', {
       headers: { Authorization: `Bearer ${token}` }
     });
-    setTransactions(res.data);
+    const planned = res.data.items;
+    setForecastMonths(planned.length ? planned[planned.length - 1].months_until_affordable : null);
   };
 
   useEffect(() => {
     fetchWishlist();
-    fetchTransactions();
   }, []);
 
-  // --- Прогноз на основі items + transactions
-  const calculateForecast = () => {
-    if (!transactions.length || !items.length) {
-      setForecastMonths(null);
-      return;
-    }
-
-    const threeMonthsAgo = new Date();
-    threeMonthsAgo.setMonth(threeMonthsAgo.getMonth() - 3);
-
-    const recentTx = transactions.filter(tx => new Date(tx.date) >= threeMonthsAgo);
-
-    const totalIncome = recentTx.filter(tx => tx.type === 'income')
-      .reduce((sum, tx) => sum + tx.amount, 0);
-    const totalExpenses = recentTx.filter(tx => tx.type === 'expenses')
-      .reduce((sum, tx) => sum + tx.amount, 0);
-    const avgMonthlyBalance = (totalIncome - totalExpenses) / 3;
-
-    const remainingWishlist = items.filter(i => !i.is_bought)
-      .reduce((sum, i) => sum + i.price, 0);
-
-    if (avgMonthlyBalance > 0) {
-      setForecastMonths(Math.ceil(remainingWishlist / avgMonthlyBalance));
-    } else {
-      setForecastMonths(null);
-    }
-  };
-
   // --- Авто-оновлення прогнозу
   useEffect(() => {
-    calculateForecast();
-  }, [items, transactions]);
+    fetchPlan();
+  }, [items]);
 
   // --- Toggle item
   const toggleItem = async (id: number) => {